@@ -0,0 +1,216 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+from .compositing import premultiply
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(PACKAGE_DIR)
+REPO_DIR = os.path.dirname(os.path.dirname(PROJECT_DIR))
+BUNDLE_PATH = os.path.join(PROJECT_DIR, "images", "effects_bundle")
+
+# Every effect asset, as groups of premultiplied BGRA frames
+ASSET_GROUPS = {
+    "explosion": {"files": [os.path.join(REPO_DIR, "explosion_icon.png")]},
+    "snowflake": {"files": [os.path.join(REPO_DIR, "snowflake_icon.png")]},
+    "sparkles": {"directory": os.path.join(REPO_DIR, "sparkles")},
+    "fire": {"gif": os.path.join(PROJECT_DIR, "images", "fire.gif"), "square": True, "fade_dark": True},
+}
+
+_ALIGN = 64
+
+
+def _source_files(spec):
+    if "files" in spec:
+        return list(spec["files"])
+    if "directory" in spec:
+        directory = spec["directory"]
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith(".png")]
+    return [spec["gif"]]
+
+
+def _source_stamp(spec):
+    """Names, sizes and mtimes of a group's sources, to detect a stale bundle"""
+    stamp = []
+    for path in _source_files(spec):
+        if os.path.exists(path):
+            st = os.stat(path)
+            stamp.append([os.path.relpath(path, REPO_DIR), st.st_size, int(st.st_mtime)])
+    return stamp
+
+
+def _to_bgra(image):
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGRA)
+    if image.shape[2] == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    return image
+
+
+def fade_dark_pixels(image, low=40, high=120):
+    """Fade dark pixels of a BGRA image to transparent, ramping alpha by brightness between `low` and `high`"""
+    brightness = image[:, :, :3].max(axis=2).astype(np.float32)
+    ramp = np.clip((brightness - low) / (high - low), 0.0, 1.0)
+    image[:, :, 3] = np.minimum(image[:, :, 3], (ramp * 255 + 0.5).astype(np.uint8))
+    return image
+
+
+def decode_group(name):
+    """
+    Decode an asset group from its source files.
+
+    Returns:
+        tuple: (frames, metadata) with premultiplied BGRA frames and a dict
+        that has per-frame "durations" in milliseconds for animations
+    """
+    spec = ASSET_GROUPS[name]
+    frames = []
+    durations = []
+
+    if "gif" in spec:
+        from PIL import Image, ImageSequence
+
+        if os.path.exists(spec["gif"]):
+            gif = Image.open(spec["gif"])
+            for frame in ImageSequence.Iterator(gif):
+                durations.append(frame.info.get("duration") or 100)
+                frames.append(cv2.cvtColor(np.array(frame.convert("RGBA")), cv2.COLOR_RGBA2BGRA))
+    else:
+        for path in _source_files(spec):
+            image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if image is not None:
+                frames.append(_to_bgra(image))
+                durations.append(0)
+
+    processed = []
+    for frame in frames:
+        if spec.get("square"):
+            side = max(frame.shape[:2])
+            frame = cv2.resize(frame, (side, side), interpolation=cv2.INTER_AREA)
+        if spec.get("fade_dark"):
+            frame = fade_dark_pixels(frame)
+        processed.append(premultiply(frame))
+    return processed, {"durations": durations}
+
+
+def compile_bundle(path=BUNDLE_PATH, groups=None):
+    """
+    Decode and preprocess every asset group into one bundle: `path + ".bin"`
+    holds the raw frames back to back (64-byte aligned) and `path + ".json"`
+    their shapes, offsets, metadata and source stamps.
+    """
+    manifest = {}
+    offset = 0
+    with open(path + ".bin", "wb") as f:
+        for name in groups or ASSET_GROUPS:
+            frames, metadata = decode_group(name)
+            entries = []
+            for frame in frames:
+                padding = -offset % _ALIGN
+                f.write(b"\0" * padding)
+                offset += padding
+                frame = np.ascontiguousarray(frame)
+                f.write(frame.tobytes())
+                entries.append({"offset": offset, "shape": list(frame.shape)})
+                offset += frame.nbytes
+            manifest[name] = {"frames": entries, "metadata": metadata,
+                              "sources": _source_stamp(ASSET_GROUPS[name])}
+
+    with open(path + ".json", "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+class AssetBundle:
+    def __init__(self, path=BUNDLE_PATH, mmap=True):
+        """
+        Lazily loaded effect assets.
+
+        Groups are only read on first request. When a compiled bundle exists
+        and matches the source files, frames are memory-mapped from it (only
+        pages that are actually touched get loaded); otherwise the group is
+        decoded from its sources.
+
+        Args:
+            path (str): Bundle path without extension (see `compile_bundle`)
+            mmap (bool): Memory-map bundle frames instead of reading them
+        """
+        self.path = path
+        self.mmap = mmap
+        self.manifest = None
+        self.groups = {}
+
+        if os.path.exists(path + ".json") and os.path.exists(path + ".bin"):
+            with open(path + ".json") as f:
+                self.manifest = json.load(f)
+
+    def _bundled(self, name):
+        entry = self.manifest and self.manifest.get(name)
+        if entry is None or entry["sources"] != _source_stamp(ASSET_GROUPS[name]):
+            return None
+        return entry
+
+    def _load(self, name):
+        group = self.groups.get(name)
+        if group is not None:
+            return group
+
+        entry = self._bundled(name)
+        if entry is None:
+            group = decode_group(name)
+        else:
+            data = (np.memmap(self.path + ".bin", np.uint8, mode="r") if self.mmap
+                    else np.fromfile(self.path + ".bin", np.uint8))
+            frames = []
+            for frame in entry["frames"]:
+                size = int(np.prod(frame["shape"]))
+                frames.append(data[frame["offset"]:frame["offset"] + size].reshape(frame["shape"]))
+            group = (frames, entry["metadata"])
+
+        self.groups[name] = group
+        return group
+
+    def frames(self, name):
+        """Get the premultiplied BGRA frames of a group, loading it on first use"""
+        return self._load(name)[0]
+
+    def metadata(self, name):
+        return self._load(name)[1]
+
+    def release(self, name):
+        """Drop a loaded group; it is loaded again on the next request"""
+        self.groups.pop(name, None)
+
+    def count(self, name):
+        """Number of frames in a group, read from the bundle when possible so nothing is decoded"""
+        if name in self.groups:
+            return len(self.groups[name][0])
+        entry = self._bundled(name)
+        if entry is not None:
+            return len(entry["frames"])
+        spec = ASSET_GROUPS[name]
+        if "gif" not in spec:
+            return len(_source_files(spec))
+        return len(self.frames(name))
+
+
+_bundle = None
+
+
+def get_bundle():
+    """Get the shared default bundle"""
+    global _bundle
+    if _bundle is None:
+        _bundle = AssetBundle()
+    return _bundle
+
+
+if __name__ == "__main__":
+    manifest = compile_bundle()
+    for name, entry in manifest.items():
+        print(f"{name}: {len(entry['frames'])} frame(s)")
+    print(f"Wrote {BUNDLE_PATH}.bin ({os.path.getsize(BUNDLE_PATH + '.bin') / 1e6:.1f} MB)")
@@ -0,0 +1,198 @@
+import cv2
+import numpy as np
+
+
+def _opacity_scale(opacity):
+    """Convert a 0-1 opacity into an 8.8 fixed-point multiplier (0-256)"""
+    return min(256, max(0, int(opacity * 256 + 0.5)))
+
+
+def _div255(acc):
+    """Exact rounding division by 255 for uint16 accumulators, in place"""
+    acc += 128
+    acc += acc >> 8
+    acc >>= 8
+    return acc
+
+
+def clip_region(frame_shape, sprite_shape, x, y):
+    """
+    Intersect a sprite placed with its top-left corner at (x, y) with the frame.
+
+    Returns:
+        tuple: (frame_slices, sprite_slices), or None if nothing is visible
+    """
+    fh, fw = frame_shape[:2]
+    sh, sw = sprite_shape[:2]
+    x, y = int(x), int(y)
+
+    fx1, fy1 = max(x, 0), max(y, 0)
+    fx2, fy2 = min(x + sw, fw), min(y + sh, fh)
+    if fx1 >= fx2 or fy1 >= fy2:
+        return None
+
+    frame_slices = (slice(fy1, fy2), slice(fx1, fx2))
+    sprite_slices = (slice(fy1 - y, fy2 - y), slice(fx1 - x, fx2 - x))
+    return frame_slices, sprite_slices
+
+
+def premultiply(image):
+    """Return a copy of a straight-alpha BGRA image with color premultiplied by alpha"""
+    out = image.copy()
+    color = image[..., :3].astype(np.uint16)
+    color *= image[..., 3:4]
+    out[..., :3] = _div255(color)
+    return out
+
+
+def blend_premultiplied(frame, sprite, x, y, opacity=1.0):
+    """
+    Composite a premultiplied BGRA sprite onto a BGR frame in place.
+
+    The sprite is placed with its top-left corner at (x, y) and clipped to the
+    frame, so partially visible sprites are still drawn. A premultiplied BGRA
+    target is also accepted, in which case its alpha is composited as well.
+
+    Args:
+        frame (numpy.ndarray): uint8 BGR (or premultiplied BGRA) frame, modified in place
+        sprite (numpy.ndarray): uint8 premultiplied BGRA sprite
+        x (int): Left edge of the sprite in frame coordinates
+        y (int): Top edge of the sprite in frame coordinates
+        opacity (float): Global opacity multiplier (0-1)
+
+    Returns:
+        numpy.ndarray: The same frame
+    """
+    region = clip_region(frame.shape, sprite.shape, x, y)
+    k = _opacity_scale(opacity)
+    if region is None or k == 0:
+        return frame
+
+    frame_slices, sprite_slices = region
+    dst = frame[frame_slices]
+    src = sprite[sprite_slices]
+
+    color = src[..., :dst.shape[2]].astype(np.uint16)
+    inv_alpha = src[..., 3:4].astype(np.uint16)
+    if k < 256:
+        color *= k
+        color >>= 8
+        inv_alpha *= k
+        inv_alpha >>= 8
+    np.subtract(255, inv_alpha, out=inv_alpha)
+
+    acc = dst.astype(np.uint16)
+    acc *= inv_alpha
+    _div255(acc)
+    acc += color
+    np.copyto(dst, acc, casting="unsafe")
+    return frame
+
+
+def split_premultiplied(sprite):
+    """
+    Split a premultiplied BGRA image into contiguous color and 3-channel
+    inverse-alpha planes for `blend_planes`.
+
+    Returns:
+        tuple: (color, inv_alpha) uint8 arrays of shape (h, w, 3)
+    """
+    color = np.ascontiguousarray(sprite[..., :3])
+    inv_alpha = cv2.merge([255 - sprite[..., 3]] * 3)
+    return color, inv_alpha
+
+
+def blend_planes(frame, color, inv_alpha, x, y):
+    """
+    Composite precomputed premultiplied planes (see `split_premultiplied`)
+    onto a BGR frame in place, clipped to the frame.
+
+    This is the cheapest path for large layers that are built once and
+    blended every frame, since no per-call alpha conversion is needed.
+
+    Returns:
+        numpy.ndarray: The same frame
+    """
+    region = clip_region(frame.shape, color.shape, x, y)
+    if region is None:
+        return frame
+
+    frame_slices, sprite_slices = region
+    dst = frame[frame_slices]
+    cv2.multiply(dst, inv_alpha[sprite_slices], dst, scale=1 / 255)
+    cv2.add(dst, color[sprite_slices], dst)
+    return frame
+
+
+def blend_additive(frame, color, x, y):
+    """
+    Add a premultiplied BGR image onto a BGR frame in place with saturation,
+    clipped to the frame. Suited to emissive sprites on a black background
+    (fire, glows) and much cheaper than alpha compositing.
+
+    Returns:
+        numpy.ndarray: The same frame
+    """
+    region = clip_region(frame.shape, color.shape, x, y)
+    if region is None:
+        return frame
+
+    frame_slices, sprite_slices = region
+    dst = frame[frame_slices]
+    cv2.add(dst, color[sprite_slices], dst)
+    return frame
+
+
+def blend_straight(frame, color, alpha, x, y, opacity=1.0):
+    """
+    Composite a straight (non-premultiplied) color image and alpha mask onto a
+    BGR frame in place, clipping to the frame.
+
+    Args:
+        frame (numpy.ndarray): uint8 BGR frame, modified in place
+        color (numpy.ndarray): uint8 BGR image of shape (h, w, 3)
+        alpha (numpy.ndarray): uint8 alpha mask of shape (h, w)
+        x (int): Left edge of the image in frame coordinates
+        y (int): Top edge of the image in frame coordinates
+        opacity (float): Global opacity multiplier (0-1)
+
+    Returns:
+        numpy.ndarray: The same frame
+    """
+    region = clip_region(frame.shape, color.shape, x, y)
+    k = _opacity_scale(opacity)
+    if region is None or k == 0:
+        return frame
+
+    frame_slices, sprite_slices = region
+    dst = frame[frame_slices]
+
+    a = alpha[sprite_slices][..., None].astype(np.uint16)
+    if k < 256:
+        a *= k
+        a >>= 8
+
+    # dst * (255 - a) + src * a never exceeds 255 * 255, so uint16 is enough
+    acc = color[sprite_slices].astype(np.uint16)
+    acc *= a
+    np.subtract(255, a, out=a)
+    acc += dst * a
+    np.copyto(dst, _div255(acc), casting="unsafe")
+    return frame
+
+
+def blend_rgba(frame, image, x, y, opacity=1.0):
+    """Composite a straight-alpha BGRA image onto a BGR frame in place"""
+    return blend_straight(frame, image[..., :3], image[..., 3], x, y, opacity)
+
+
+def blend_rgba_centered(frame, image, cx, cy, opacity=1.0):
+    """Composite a straight-alpha BGRA image centered on (cx, cy)"""
+    h, w = image.shape[:2]
+    return blend_rgba(frame, image, int(cx - w // 2), int(cy - h // 2), opacity)
+
+
+def blend_premultiplied_centered(frame, sprite, cx, cy, opacity=1.0):
+    """Composite a premultiplied BGRA sprite centered on (cx, cy)"""
+    h, w = sprite.shape[:2]
+    return blend_premultiplied(frame, sprite, int(cx - w // 2), int(cy - h // 2), opacity)
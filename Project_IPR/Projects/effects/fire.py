@@ -1,66 +1,92 @@
-from PIL import Image, ImageSequence
-import cv2
 import numpy as np
+import time
+from .assets import get_bundle
+from .compositing import blend_additive, blend_premultiplied
+from .registry import Effect
+from .sprite_cache import SpriteCache
 
-class FireEffect:
-    def __init__(self):
-        # Load and prepare fire GIF frames
-        self.fire_frames = self._load_fire_gif("images/fire.gif")
-        self.frame_index = 0
-        
-    def _load_fire_gif(self, gif_path):
-        """Load and process GIF frames"""
+class FireEffect(Effect):
+    def __init__(self, size_step=8, max_bytes=32 * 1024 * 1024, additive=True, assets=None):
+        """
+        Args:
+            size_step (int): Fire sizes are rounded to multiples of this many
+                pixels, so resized frames can be cached and reused
+            max_bytes (int): Memory cap for the cached resized frames
+            additive (bool): Add the fire onto the frame (cheap, glowing)
+                instead of alpha compositing it
+            assets (AssetBundle, optional): Where the fire frames come from;
+                they are loaded on the first `draw_fire`
+        """
+        self.size_step = size_step
+        self.max_bytes = max_bytes
+        self.additive = additive
+        self.assets = assets or get_bundle()
+        self.sprite_cache = None
+        self.frame_names = []
+        self.frame_ends = None
+        self.frame_side = 1
+        self.start_time = None
+        self.targets = []
+
+    def _load_fire_frames(self):
+        """Register the fire frames with a new sprite cache; each is only read when first shown"""
         try:
-            gif = Image.open(gif_path)
-            fire_frames = []
-            
-            for frame in ImageSequence.Iterator(gif):
-                frame = frame.convert("RGBA")
-                frame_np = cv2.cvtColor(np.array(frame), cv2.COLOR_RGBA2BGRA)
-                fire_frames.append(self._remove_black_background(frame_np))
-                
-            return fire_frames
+            frames = self.assets.frames("fire")
+            durations = self.assets.metadata("fire")["durations"]
         except Exception as e:
             print(f"Error loading fire GIF: {str(e)}")
-            return []
-            
-    def _remove_black_background(self, image):
-        """Convert black pixels to transparent"""
-        bgr = image[:, :, :3]
-        alpha = image[:, :, 3]
-        
-        # Create mask where pixels are nearly black
-        black_mask = (bgr[:, :, 0] < 80) & (bgr[:, :, 1] < 80) & (bgr[:, :, 2] < 80)
-        
-        # Smooth transparency for better blending
-        alpha[black_mask] = 0
-        image[:, :, 3] = alpha
-        return image
+            frames, durations = [], []
+        self.frame_side = frames[0].shape[0] if frames else 1
+        self.sprite_cache = SpriteCache(scale_step=self.size_step / self.frame_side, angle_step=0,
+                                        max_bytes=self.max_bytes)
+        for i, fire_frame in enumerate(frames):
+            name = f"fire:{i}"
+            if self.additive:
+                # Only the premultiplied color is needed to add light
+                self.sprite_cache.register_lazy(name, lambda f=fire_frame: np.ascontiguousarray(f[:, :, :3]),
+                                                premultiplied=True)
+            else:
+                self.sprite_cache.register_lazy(name, lambda f=fire_frame: f, premultiplied=True)
+            self.frame_names.append(name)
+        self.frame_ends = np.cumsum(durations)
+
+    def _frame_at(self, now):
+        """Get the GIF frame shown `now` milliseconds, by its own frame durations"""
+        if self.start_time is None:
+            self.start_time = now
+        elapsed = (now - self.start_time) % self.frame_ends[-1]
+        return int(np.searchsorted(self.frame_ends, elapsed, side="right"))
         
-    def draw_fire(self, frame, x, y, size=200):
+    def draw_fire(self, frame, x, y, size=200, now=None):
         """Draw animated fire effect at specified position with adjustable size"""
-        if not self.fire_frames:
+        if self.sprite_cache is None:
+            self._load_fire_frames()
+        if not self.frame_names:
             return frame
-            
-        # Get current frame and resize
-        fire_frame = self.fire_frames[self.frame_index]
-        fire_resized = cv2.resize(fire_frame, (size, size), interpolation=cv2.INTER_AREA)
-        
-        # Calculate position (centered)
-        x1, y1 = x - size // 2, y - size // 2
-        x2, y2 = x1 + size, y1 + size
-        
-        # Check boundaries
-        if x1 < 0 or y1 < 0 or x2 >= frame.shape[1] or y2 >= frame.shape[0]:
-            return frame
-            
-        # Blend with background
-        bgr = fire_resized[:, :, :3]
-        alpha = fire_resized[:, :, 3] / 255.0  # Normalize
-        
-        for c in range(3):  # BGR channels
-            frame[y1:y2, x1:x2, c] = (1 - alpha) * frame[y1:y2, x1:x2, c] + (alpha * bgr[:, :, c])
+
+        # Animation follows wall time, so every hand shows the same frame
+        now = time.monotonic() * 1000 if now is None else now
+        name = self.frame_names[self._frame_at(now)]
+        sprite = self.sprite_cache.get(name, size / self.frame_side)
         
-        # Update frame index for animation
-        self.frame_index = (self.frame_index + 1) % len(self.fire_frames)
-        return frame
\ No newline at end of file
+        # Calculate position (centered) and blend, clipped to the frame
+        h, w = sprite.shape[:2]
+        x1, y1 = x - w // 2, y - h // 2
+        if self.additive:
+            blend_additive(frame, sprite, x1, y1)
+        else:
+            blend_premultiplied(frame, sprite, x1, y1)
+        return frame
+
+    def update(self, dt, hands):
+        self.targets = [hand.palm_center for hand in hands if hand.is_open]
+
+    def render(self, frame):
+        for x, y in self.targets:
+            frame = self.draw_fire(frame, x, y, size=self.intensity * 2, now=self.clock.now_ms)
+        return frame
+
+    def release(self):
+        self.sprite_cache = None
+        self.frame_names = []
+        self.assets.release("fire")
\ No newline at end of file
@@ -1,18 +1,34 @@
 import cv2
 import numpy as np
+import time
+from .registry import Effect
 
-class FireworksEffect:
-    def __init__(self):
+class FireworksEffect(Effect):
+    def __init__(self, particle_system=None, spark_lifetime=600):
+        """
+        Args:
+            particle_system (ParticleSystem, optional): When given, sparks are
+                emitted into this pool and fly outward over `spark_lifetime`
+                milliseconds instead of being redrawn as static lines
+            spark_lifetime (int): Lifetime of a spark in milliseconds
+        """
         self.colors = [
             (255, 0, 0), (0, 255, 0), (0, 0, 255),
             (255, 255, 0), (255, 0, 255), (0, 255, 255)
         ]
+        self.particles = particle_system
+        self.spark_lifetime = spark_lifetime
+        self.targets = []
         
-    def draw_firework(self, frame, x, y, size=50):
+    def draw_firework(self, frame, x, y, size=50, now=None):
         """Draw a firework explosion at the specified position"""
         # Draw central burst
         cv2.circle(frame, (x, y), int(size/10), (255, 255, 255), -1)
         
+        if self.particles is not None:
+            self.emit_sparks(x, y, size, now)
+            return self.draw_sparks(frame, now)
+
         # Create particles
         particle_count = int(size/5)
         for _ in range(particle_count):
@@ -24,4 +40,58 @@ class FireworksEffect:
             thickness = np.random.randint(1, 3)
             cv2.line(frame, (x, y), (end_x, end_y), color, thickness)
             
+        return frame
+
+    def update(self, dt, hands):
+        self.targets = [hand.palm_center for hand in hands if hand.is_open]
+
+    def render(self, frame):
+        now = self.clock.now_ms
+        if self.particles is None:
+            for x, y in self.targets:
+                frame = self.draw_firework(frame, x, y, size=self.intensity, now=now)
+            return frame
+
+        # Emit for every hand first, then advance and draw the shared pool once
+        for x, y in self.targets:
+            cv2.circle(frame, (x, y), int(self.intensity/10), (255, 255, 255), -1)
+            self.emit_sparks(x, y, self.intensity, now)
+        return self.draw_sparks(frame, now)
+
+    def release(self):
+        if self.particles is not None:
+            self.particles.clear()
+
+    def emit_sparks(self, x, y, size=50, now=None):
+        """Emit radial sparks into the particle system"""
+        now = time.monotonic() * 1000 if now is None else now
+        particle_count = int(size/5)
+        angle = np.random.uniform(0, 2 * np.pi, particle_count)
+        speed = np.random.randint(size//2, max(1, size), particle_count) / self.spark_lifetime
+        colors = np.array(self.colors, np.uint8)[np.random.randint(0, len(self.colors), particle_count)]
+        self.particles.emit(x, y, now, self.spark_lifetime,
+                            size=np.random.randint(1, 3, particle_count),
+                            vx=speed * np.cos(angle), vy=speed * np.sin(angle),
+                            color=colors)
+
+    def draw_sparks(self, frame, now=None):
+        """Advance the sparks and draw each one as a short fading streak"""
+        now = time.monotonic() * 1000 if now is None else now
+        ps = self.particles
+        ps.update(now)
+        n = len(ps)
+        if n == 0:
+            return frame
+
+        fade = 1.0 - ps.age_ratio(now)
+        tail = 120  # streak length in milliseconds of motion
+        x2, y2 = ps.x[:n], ps.y[:n]
+        x1 = x2 - ps.vx[:n] * tail * fade
+        y1 = y2 - ps.vy[:n] * tail * fade
+        colors = (ps.color[:n] * fade[:, None]).astype(np.uint8)
+
+        for ax, ay, bx, by, color, thickness in zip(x1.astype(int).tolist(), y1.astype(int).tolist(),
+                                                    x2.astype(int).tolist(), y2.astype(int).tolist(),
+                                                    colors.tolist(), ps.size[:n].astype(int).tolist()):
+            cv2.line(frame, (ax, ay), (bx, by), color, thickness)
         return frame
\ No newline at end of file
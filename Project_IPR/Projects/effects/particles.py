@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class ParticleSystem:
+    def __init__(self, capacity=2048):
+        """
+        Structure-of-arrays particle pool with a hard capacity.
+
+        Live particles are kept packed in the first `count` slots (oldest
+        first), so aging, culling and motion are single vectorized passes
+        against one timestamp per frame. Time and velocity units are whatever
+        the caller uses consistently (the effects use milliseconds).
+
+        Args:
+            capacity (int): Maximum number of live particles
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        self.last_update = None
+
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.size = np.zeros(capacity, np.float32)
+        self.birth = np.zeros(capacity, np.float64)
+        self.lifetime = np.ones(capacity, np.float32)
+        self.kind = np.zeros(capacity, np.int16)
+        self.color = np.zeros((capacity, 3), np.uint8)
+
+        self._fields = (self.x, self.y, self.vx, self.vy, self.size,
+                        self.birth, self.lifetime, self.kind, self.color)
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, now, lifetime, size=1.0, vx=0.0, vy=0.0, kind=0, color=(255, 255, 255)):
+        """
+        Add particles. Every argument except `now` and `color` may be a scalar
+        or an array; they are broadcast to a common length. Particles beyond
+        the pool capacity are dropped and counted in `dropped`.
+
+        Returns:
+            int: Number of particles actually emitted
+        """
+        x, y, lifetime, size, vx, vy, kind = np.broadcast_arrays(
+            np.atleast_1d(x), y, lifetime, size, vx, vy, kind)
+        n = len(x)
+        free = self.capacity - self.count
+        if n > free:
+            self.dropped += n - free
+            n = free
+        if n <= 0:
+            return 0
+
+        s = slice(self.count, self.count + n)
+        self.x[s] = x[:n]
+        self.y[s] = y[:n]
+        self.vx[s] = vx[:n]
+        self.vy[s] = vy[:n]
+        self.size[s] = size[:n]
+        self.birth[s] = now
+        self.lifetime[s] = lifetime[:n]
+        self.kind[s] = kind[:n]
+        self.color[s] = np.asarray(color, np.uint8)[:n] if np.ndim(color) == 2 else color
+        self.count += n
+        return n
+
+    def update(self, now):
+        """Cull expired particles and advance positions to `now`"""
+        dt = 0.0 if self.last_update is None else now - self.last_update
+        self.last_update = now
+
+        c = self.count
+        if c == 0:
+            return
+
+        alive = (now - self.birth[:c]) < self.lifetime[:c]
+        k = int(np.count_nonzero(alive))
+        if k < c:
+            for field in self._fields:
+                field[:k] = field[:c][alive]
+            self.count = c = k
+
+        if dt and c:
+            self.x[:c] += self.vx[:c] * dt
+            self.y[:c] += self.vy[:c] * dt
+
+    def age_ratio(self, now):
+        """Get the age of each live particle as a fraction of its lifetime (0-1)"""
+        c = self.count
+        return np.clip((now - self.birth[:c]) / self.lifetime[:c], 0.0, 1.0)
+
+    def clear(self):
+        """Remove all particles"""
+        self.count = 0
+        self.last_update = None
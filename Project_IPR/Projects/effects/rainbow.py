@@ -1,21 +1,31 @@
 import cv2
 import numpy as np
 from collections import deque
+from .registry import Effect, HandStates
 
-class RainbowEffect:
-    def __init__(self, max_length=30, trail_width=5, color_cycle_speed=0.1):
+class RainbowEffect(Effect):
+    def __init__(self, max_length=30, trail_width=5, color_cycle_speed=0.1, batched_glow=True):
         """
         Initialize the RainbowEffect with configurable parameters.
         
         Args:
-            max_length (int): Maximum number of points in the trail
+            max_length (int): Maximum number of points in the trail; driven
+                through advance(), one point is taken per simulation step
             trail_width (int): Base width of the trail
-            color_cycle_speed (float): Speed of color cycling (0-1)
+            color_cycle_speed (float): Speed of color cycling (0-1) per point
+            batched_glow (bool): Draw the glow of all segments into one layer
+                restricted to the trail's bounding box and blend it once,
+                instead of one full-frame blend per segment
         """
+        self.max_length = max_length
         self.trail = deque(maxlen=max_length)
+        # One trail per hand when driven through update()/render()
+        self.hand_trails = HandStates(lambda: deque(maxlen=self.trail.maxlen))
+        self.tips = []
         self.base_width = trail_width
         self.color_cycle_speed = color_cycle_speed
         self.color_offset = 0
+        self.batched_glow = batched_glow
         
         # More vibrant rainbow colors with additional hues
         self.rainbow_colors = [
@@ -38,6 +48,10 @@ class RainbowEffect:
         
         # Pre-compute color gradients for smoother transitions
         self.color_gradients = self._create_color_gradients()
+        self.gradient_array = np.array(self.color_gradients, dtype=np.float64)
+
+        # Per trail length: (thickness, color position) of every segment
+        self.segment_styles = {}
 
     def _create_color_gradients(self):
         """Create smooth color gradients between the rainbow colors"""
@@ -50,6 +64,57 @@ class RainbowEffect:
             gradients.extend(gradient)
         return gradients
 
+    def _get_segment_style(self, length):
+        """Get the cached thickness and base color position tables for a trail length"""
+        style = self.segment_styles.get(length)
+        if style is None:
+            i = np.arange(1, length)
+            thickness = np.maximum(1, (self.base_width * (1 - i / length) + 1).astype(int))
+            color_pos = i * len(self.color_gradients) / length
+            style = self.segment_styles[length] = (thickness, color_pos)
+        return style
+
+    def set_quality(self, settings):
+        self.set_max_length(max(2, int(self.max_length * settings["trail"])))
+
+    def update(self, dt, hands):
+        self.tips = [(trail, hand.index_tip) for hand, trail in self.hand_trails.update(hands)]
+
+    def step(self, dt):
+        # Sample the trails at the fixed rate, so their length in time doesn't depend on the frame rate
+        for trail, tip in self.tips:
+            trail.append(tip)
+        if self.tips:
+            self.color_offset = (self.color_offset + self.color_cycle_speed) % len(self.color_gradients)
+
+    def render(self, frame):
+        # End each trail at the newest fingertip and cycle colors by the time since the last step
+        tips = {id(trail): tip for trail, tip in self.tips}
+        trails = []
+        for trail in self.hand_trails.values():
+            points = list(trail)
+            tip = tips.get(id(trail))
+            if tip is not None and (not points or points[-1] != tip):
+                points.append(tip)
+            if len(points) >= 2:
+                trails.append(points)
+        if not trails:
+            return frame
+
+        color_offset = self.color_offset
+        if self.tips:
+            color_offset = (color_offset + self.color_cycle_speed * self.clock.alpha) % len(self.color_gradients)
+        if self.batched_glow:
+            return self._draw_trails_batched(frame, trails, color_offset)
+        for trail in trails:
+            self._draw_trail(frame, trail, color_offset)
+        return frame
+
+    def release(self):
+        self.clear_trail()
+        self.hand_trails.clear()
+        self.tips = []
+
     def update_trail(self, x, y):
         """
         Add a new point to the trail.
@@ -73,30 +138,74 @@ class RainbowEffect:
         """
         if len(self.trail) < 2:
             return frame
-            
+
+        if self.batched_glow:
+            return self._draw_trails_batched(frame, [self.trail], self.color_offset)
+        return self._draw_trail(frame, self.trail, self.color_offset)
+
+    def _draw_trail(self, frame, trail, color_offset):
+        """Draw one trail segment by segment, blending the glow of each over the whole frame"""
         # Draw each segment with appropriate color and thickness
-        for i in range(1, len(self.trail)):
+        for i in range(1, len(trail)):
             # Calculate dynamic thickness (thicker at the start)
-            thickness = max(1, int(self.base_width * (1 - i/len(self.trail)) + 1))
+            thickness = max(1, int(self.base_width * (1 - i/len(trail)) + 1))
             
             # Get color with cycling effect
-            color_index = int((i * len(self.color_gradients) / len(self.trail) + self.color_offset) % len(self.color_gradients))
+            color_index = int((i * len(self.color_gradients) / len(trail) + color_offset) % len(self.color_gradients))
             color = self.color_gradients[color_index]
             
             # Draw anti-aliased line
-            cv2.line(frame, self.trail[i-1], self.trail[i], color, thickness, 
+            cv2.line(frame, trail[i-1], trail[i], color, thickness, 
                     lineType=cv2.LINE_AA)
             
             # Add glow effect by drawing a semi-transparent thicker line
             if thickness > 2:
                 glow_color = (*color, 50)  # Add alpha for blending
                 overlay = frame.copy()
-                cv2.line(overlay, self.trail[i-1], self.trail[i], color, thickness+2, 
+                cv2.line(overlay, trail[i-1], trail[i], color, thickness+2, 
                          lineType=cv2.LINE_AA)
                 cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
         
         return frame
 
+    def _draw_trails_batched(self, frame, trails, color_offset):
+        """Draw trails with a single glow pass over their common bounding box"""
+        styles = []
+        for trail in trails:
+            thickness, color_pos = self._get_segment_style(len(trail))
+            color_index = ((color_pos + color_offset) % len(self.color_gradients)).astype(int)
+            styles.append((np.array(trail, dtype=np.int32), thickness.tolist(),
+                           self.gradient_array[color_index].tolist()))
+
+        # Bounding box of every trail, padded by the widest glow line
+        all_points = np.concatenate([points for points, _, _ in styles])
+        widest = max(max(thickness) for _, thickness, _ in styles)
+        pad = widest + 3
+        h, w = frame.shape[:2]
+        x0, y0 = np.maximum(all_points.min(axis=0) - pad, 0)
+        x1, y1 = np.minimum(all_points.max(axis=0) + pad + 1, (w, h))
+
+        # Glow: all thick segments into one local layer, blended once
+        if x0 < x1 and y0 < y1 and widest > 2:
+            roi = frame[y0:y1, x0:x1]
+            glow = roi.copy()
+            for points, thickness, colors in styles:
+                local = (points - (x0, y0)).tolist()
+                for i in range(1, len(local)):
+                    if thickness[i-1] > 2:
+                        cv2.line(glow, tuple(local[i-1]), tuple(local[i]), colors[i-1],
+                                 thickness[i-1] + 2, lineType=cv2.LINE_AA)
+            cv2.addWeighted(glow, 0.3, roi, 0.7, 0, roi)
+
+        # Core segments on top of the glow
+        for points, thickness, colors in styles:
+            points = points.tolist()
+            for i in range(1, len(points)):
+                cv2.line(frame, tuple(points[i-1]), tuple(points[i]), colors[i-1], thickness[i-1],
+                         lineType=cv2.LINE_AA)
+
+        return frame
+
     def clear_trail(self):
         """Clear all points from the trail."""
         self.trail.clear()
@@ -108,4 +217,6 @@ class RainbowEffect:
 
     def set_max_length(self, length):
         """Set the maximum length of the trail."""
-        self.trail = deque(self.trail, maxlen=length)
\ No newline at end of file
+        self.trail = deque(self.trail, maxlen=length)
+        for label, trail in self.hand_trails.states.items():
+            self.hand_trails.states[label] = deque(trail, maxlen=length)
\ No newline at end of file
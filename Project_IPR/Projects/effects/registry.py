@@ -0,0 +1,178 @@
+class Effect:
+    """
+    Common interface of hand effects.
+
+    Every frame the app ticks a shared `pipeline.clock.FrameClock` and calls
+    `advance(clock, hands)` with the detected hands
+    (`pipeline.gestures.HandGestures`, possibly empty), then `render(frame)`,
+    which draws onto the BGR frame and returns it. `update` sees every frame;
+    `step` runs at the clock's fixed rate, so simulations look the same at
+    any frame rate, and `render` can interpolate between the last two steps
+    with `clock.alpha`. `release` frees caches and assets when the effect is
+    dropped.
+    """
+
+    intensity = 50   # 10-100, from the intensity slider
+    clock = None     # the FrameClock of the current frame, set by advance()
+
+    def set_intensity(self, intensity):
+        self.intensity = intensity
+
+    def set_quality(self, settings):
+        """Apply a level from `pipeline.governor.QUALITY_LEVELS`"""
+
+    def advance(self, clock, hands):
+        self.clock = clock
+        self.update(clock.dt, hands)
+        for _ in range(clock.steps):
+            self.step(clock.step)
+
+    def update(self, dt, hands):
+        pass
+
+    def step(self, dt):
+        """Advance the simulation by one fixed timestep of `dt` seconds"""
+
+    def render(self, frame):
+        return frame
+
+    def release(self):
+        pass
+
+
+class HandStates:
+    def __init__(self, factory, max_missing=15):
+        """
+        Per-hand effect state keyed by `HandGestures.label` (handedness, with
+        a suffix when two hands share one), so one hand's history never mixes
+        with another's.
+
+        Args:
+            factory: Callable creating the state of a newly seen hand
+            max_missing (int): Updates a hand may be missing before its state is dropped
+        """
+        self.factory = factory
+        self.max_missing = max_missing
+        self.states = {}
+        self.missing = {}
+
+    def update(self, hands):
+        """
+        Returns:
+            list: (hand, state) for every hand in this frame
+        """
+        pairs = []
+        for hand in hands:
+            state = self.states.get(hand.label)
+            if state is None:
+                state = self.states[hand.label] = self.factory()
+            self.missing[hand.label] = 0
+            pairs.append((hand, state))
+
+        seen = {hand.label for hand in hands}
+        for label in [label for label in self.states if label not in seen]:
+            self.missing[label] += 1
+            if self.missing[label] > self.max_missing:
+                del self.states[label], self.missing[label]
+        return pairs
+
+    def values(self):
+        """States of every tracked hand, including ones missing this frame"""
+        return list(self.states.values())
+
+    def __len__(self):
+        return len(self.states)
+
+    def clear(self):
+        self.states.clear()
+        self.missing.clear()
+
+
+class EffectRegistry:
+    def __init__(self, keep_inactive=False):
+        """
+        Named effect factories, instantiated only when first selected.
+
+        Args:
+            keep_inactive (bool): Keep effects alive after switching away
+                instead of releasing them
+        """
+        self.factories = {}
+        self.instances = {}
+        self.active_name = None
+        self.keep_inactive = keep_inactive
+
+    def register(self, name, factory):
+        """Register `factory()` (returning an `Effect`) under `name`, in display order"""
+        self.factories[name] = factory
+
+    def names(self):
+        return list(self.factories)
+
+    def __contains__(self, name):
+        return name in self.factories
+
+    def get(self, name):
+        """Get the effect instance for `name`, creating it on first use"""
+        effect = self.instances.get(name)
+        if effect is None:
+            effect = self.instances[name] = self.factories[name]()
+        return effect
+
+    @property
+    def active(self):
+        return None if self.active_name is None else self.get(self.active_name)
+
+    def select(self, name):
+        """
+        Make `name` the active effect (None for no effect). Other effects are
+        released unless `keep_inactive` is set.
+
+        Returns:
+            Effect: The active effect, or None
+        """
+        if not self.keep_inactive:
+            for other in [n for n in self.instances if n != name]:
+                self.release(other)
+        self.active_name = name
+        return self.active
+
+    def release(self, name):
+        effect = self.instances.pop(name, None)
+        if effect is not None:
+            effect.release()
+
+    def release_all(self):
+        for name in list(self.instances):
+            self.release(name)
+        self.active_name = None
+
+
+def _fireworks():
+    from .fireworks import FireworksEffect
+    return FireworksEffect()
+
+
+def _sparkles():
+    from .sparkles import SparklesEffect
+    return SparklesEffect()
+
+
+def _fire():
+    from .fire import FireEffect
+    return FireEffect()
+
+
+def _rainbow():
+    from .rainbow import RainbowEffect
+    return RainbowEffect()
+
+
+def create_default_registry():
+    """Registry of the HandMagic effects; each effect module is imported when first selected"""
+    registry = EffectRegistry()
+    registry.register("Fireworks", _fireworks)
+    registry.register("Sparkles", _sparkles)
+    registry.register("Fire", _fire)
+    registry.register("Rainbow Trail", _rainbow)
+    return registry
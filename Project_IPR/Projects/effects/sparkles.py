@@ -1,22 +1,115 @@
-import cv2
 import numpy as np
+from .compositing import blend_premultiplied
+from .registry import Effect
+from .sprite_cache import SpriteCache
+
+class SparklesEffect(Effect):
+    def __init__(self, sprite_radius=64, tint_levels=4):
+        """
+        Args:
+            sprite_radius (int): Radius of the prebuilt soft sparkle sprite
+            tint_levels (int): Number of prebuilt color tints
+        """
+        self.sprite_radius = sprite_radius
+        self.sprite_cache = SpriteCache(scale_step=2 / sprite_radius, angle_step=0)
+        self.tint_levels = tint_levels
+        self.particle_scale = 1.0
+        self.targets = []
+
+        # Red channel varies 200-255 like the original flat discs
+        for level, red in enumerate(np.linspace(200, 255, tint_levels).astype(int)):
+            self.sprite_cache.register(level, self._create_soft_disc(sprite_radius, (255, 255, int(red))))
+
+    def set_quality(self, settings):
+        self.particle_scale = settings["particles"]
+        self.sprite_cache.set_resolution(settings["sprites"])
+
+    def update(self, dt, hands):
+        self.targets = [hand.palm_center for hand in hands if hand.is_open]
+
+    def render(self, frame):
+        return self.draw_sparkles_at(frame, self.targets, intensity=self.intensity / 100 * self.particle_scale)
+
+    def release(self):
+        self.sprite_cache.clear()
+
+    def _create_soft_disc(self, radius, color):
+        """Create a straight-alpha BGRA disc that fades out over its outer edge"""
+        size = 2 * radius + 1
+        yy, xx = np.mgrid[:size, :size]
+        dist = np.sqrt((xx - radius) ** 2 + (yy - radius) ** 2) / radius
+        alpha = np.clip((1.0 - dist) / 0.3, 0.0, 1.0)
+        disc = np.empty((size, size, 4), np.uint8)
+        disc[..., :3] = color
+        disc[..., 3] = (alpha * 255).astype(np.uint8)
+        return disc
 
-class SparklesEffect:
     def draw_sparkles(self, frame, x, y, intensity=0.5):
         """Draw sparkling effect at specified position"""
+        return self.draw_sparkles_at(frame, [(x, y)], intensity)
+
+    def draw_sparkles_at(self, frame, centers, intensity=0.5):
+        """
+        Draw sparkles around several positions at once. Sparkles of nearby
+        positions are accumulated into one shared layer and blended once;
+        distant groups keep separate layers so no mostly empty layer spans
+        the frame.
+        """
         sparkle_count = int(15 * intensity)
         max_size = int(90 * intensity)
-        
-        for _ in range(sparkle_count):
-            sparkle_x = x + np.random.randint(-30, 30)
-            sparkle_y = y + np.random.randint(-30, 30)
-            size = np.random.randint(2, max_size)
-            color = (255, 255, np.random.randint(200, 255))
-            alpha = np.random.uniform(0.3, 0.8)
-            
-            # Create a temporary image for blending
-            overlay = frame.copy()
-            cv2.circle(overlay, (sparkle_x, sparkle_y), size, color, -1)
-            cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
-            
-        return frame
\ No newline at end of file
+        if sparkle_count <= 0 or max_size <= 2 or not centers:
+            return frame
+
+        h, w = frame.shape[:2]
+        groups = []
+        for x, y in centers:
+            sparkles = (x + np.random.randint(-30, 30, sparkle_count),
+                        y + np.random.randint(-30, 30, sparkle_count),
+                        np.random.randint(2, max_size, sparkle_count),
+                        np.random.randint(0, self.tint_levels, sparkle_count),
+                        np.random.uniform(0.3, 0.8, sparkle_count))
+            box = self._bounding_box(sparkles, w, h)
+            if box is None:
+                continue
+
+            for group in groups:
+                union = (min(box[0], group[0][0]), min(box[1], group[0][1]),
+                         max(box[2], group[0][2]), max(box[3], group[0][3]))
+                if self._area(union) <= 2 * (self._area(box) + self._area(group[0])):
+                    group[0] = union
+                    group[1] = tuple(np.concatenate(pair) for pair in zip(group[1], sparkles))
+                    break
+            else:
+                groups.append([box, sparkles])
+
+        for box, sparkles in groups:
+            self._draw_layer(frame, box, *sparkles)
+        return frame
+
+    @staticmethod
+    def _area(box):
+        return (box[2] - box[0]) * (box[3] - box[1])
+
+    @staticmethod
+    def _bounding_box(sparkles, w, h):
+        """Frame-clipped (x0, y0, x1, y1) covering every sparkle, or None if off screen"""
+        sparkle_x, sparkle_y, size = sparkles[:3]
+        x0 = max(int((sparkle_x - size).min()), 0)
+        y0 = max(int((sparkle_y - size).min()), 0)
+        x1 = min(int((sparkle_x + size).max()) + 1, w)
+        y1 = min(int((sparkle_y + size).max()) + 1, h)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def _draw_layer(self, frame, box, sparkle_x, sparkle_y, size, tint, alpha):
+        """Accumulate sparkles into one buffer covering `box` and blend it once"""
+        x0, y0, x1, y1 = box
+        layer = np.zeros((y1 - y0, x1 - x0, 4), np.uint8)  # premultiplied BGRA
+        for sx, sy, radius, level, a in zip(sparkle_x.tolist(), sparkle_y.tolist(), size.tolist(),
+                                            tint.tolist(), alpha.tolist()):
+            sprite = self.sprite_cache.get(level, radius / self.sprite_radius)
+            sh, sw = sprite.shape[:2]
+            blend_premultiplied(layer, sprite, sx - x0 - sw // 2, sy - y0 - sh // 2, a)
+
+        blend_premultiplied(frame, layer, x0, y0)
\ No newline at end of file
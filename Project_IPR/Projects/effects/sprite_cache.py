@@ -0,0 +1,162 @@
+from collections import OrderedDict
+
+import cv2
+
+from .compositing import premultiply
+
+
+class SpriteCache:
+    def __init__(self, scale_step=0.05, angle_step=10, max_bytes=16 * 1024 * 1024):
+        """
+        Bounded LRU cache of pre-scaled, pre-rotated premultiplied sprites.
+
+        Scale and rotation angle are quantized into buckets so that sprites
+        requested every frame with random parameters resolve to a small set of
+        cached images instead of being resampled each time.
+
+        Args:
+            scale_step (float): Width of a scale bucket
+            angle_step (float): Width of a rotation bucket in degrees
+            max_bytes (int): Memory cap for cached sprites
+        """
+        self.base_scale_step = scale_step
+        self.base_angle_step = angle_step
+        self.scale_step = scale_step
+        self.angle_step = angle_step
+        self.max_bytes = max_bytes
+
+        self.sources = {}
+        self.loaders = {}
+        self.sprites = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name, image, premultiplied=False):
+        """
+        Register a source image under `name`: straight-alpha BGRA, or with
+        `premultiplied=True` an already premultiplied image of any channel count
+        """
+        if image is None:
+            return
+        self.sources[name] = image if premultiplied else premultiply(image)
+        self.loaders.pop(name, None)
+        self._evict_source(name)
+
+    def register_lazy(self, name, loader, premultiplied=False):
+        """
+        Register `loader()`, called on the first `get` of `name`, as the
+        source image. It is called again after `unload(name)`.
+        """
+        self.sources.pop(name, None)
+        self._evict_source(name)
+        self.loaders[name] = (loader, premultiplied)
+
+    def unload(self, name):
+        """Drop the cached sprites of `name`, and its source if it was registered lazily"""
+        self._evict_source(name)
+        if name in self.loaders:
+            self.sources.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self.sources or name in self.loaders
+
+    def _bucket(self, scale, angle):
+        scale_bucket = max(1, int(round(scale / self.scale_step)))
+        angle_bucket = 0
+        if self.angle_step:
+            angle_bucket = int(round((angle % 360) / self.angle_step)) % int(round(360 / self.angle_step))
+        return scale_bucket, angle_bucket
+
+    def get(self, name, scale, angle=0.0):
+        """
+        Get the premultiplied BGRA sprite for `name` at the bucket nearest to
+        (scale, angle).
+
+        Returns:
+            numpy.ndarray: The cached sprite, or None if `name` is unknown
+        """
+        scale_bucket, angle_bucket = self._bucket(scale, angle)
+        key = (name, scale_bucket, angle_bucket)
+
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        source = self.sources.get(name)
+        if source is None:
+            if name not in self.loaders:
+                return None
+            loader, premultiplied = self.loaders[name]
+            image = loader()
+            if image is None:
+                del self.loaders[name]
+                return None
+            source = self.sources[name] = image if premultiplied else premultiply(image)
+
+        self.misses += 1
+        sprite = self._render(source, scale_bucket * self.scale_step, angle_bucket * self.angle_step)
+        self.sprites[key] = sprite
+        self.current_bytes += sprite.nbytes
+        self._trim()
+        return sprite
+
+    def _render(self, source, scale, angle):
+        """Resample a premultiplied source at the given scale and angle"""
+        h, w = source.shape[:2]
+        new_w = max(1, int(w * scale))
+        new_h = max(1, int(h * scale))
+        sprite = cv2.resize(source, (new_w, new_h), interpolation=cv2.INTER_AREA)
+
+        if angle:
+            M = cv2.getRotationMatrix2D((new_w // 2, new_h // 2), angle, 1.0)
+            sprite = cv2.warpAffine(sprite, M, (new_w, new_h), flags=cv2.INTER_LINEAR,
+                                    borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
+        return sprite
+
+    def _trim(self):
+        while self.current_bytes > self.max_bytes and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+
+    def _evict_source(self, name):
+        for key in [k for k in self.sprites if k[0] == name]:
+            self.current_bytes -= self.sprites.pop(key).nbytes
+
+    def set_resolution(self, factor):
+        """
+        Scale bucket resolution relative to the construction-time steps
+        (1.0 = full, 0.5 = buckets twice as wide). Sprites keep their size on
+        screen; wider buckets only mean fewer distinct sprites to resample and
+        cache. Cached sprites are dropped.
+        """
+        self.scale_step = self.base_scale_step / factor
+        self.angle_step = self.base_angle_step / factor
+        self.sprites.clear()
+        self.current_bytes = 0
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory cap, evicting least recently used sprites if needed"""
+        self.max_bytes = max_bytes
+        self._trim()
+
+    def clear(self):
+        """Drop all cached sprites and reset the counters (sources are kept)"""
+        self.sprites.clear()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Get cache counters as a dict"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.sprites),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -5,14 +5,16 @@ import mediapipe as mp
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QPushButton, QComboBox,
                              QSlider, QGroupBox, QMenuBar, QMenu, QAction,
-                             QInputDialog, QDialog, QFormLayout, QLineEdit)
+                             QInputDialog, QDialog, QFormLayout, QLineEdit,
+                             QFileDialog)
 from PyQt5.QtCore import Qt, QTimer, QSettings
-from PyQt5.QtGui import QImage, QPixmap
-from effects import fireworks, sparkles, fire, rainbow
+from effects import registry
+from pipeline import capture, clock, gestures, governor, inference, landmark_filter, preprocess, replay, roi, timing
+from video_widget import create_video_widget
 
 
 class KeyBindingDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, effect_names, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Configure Key Binding")
         self.setFixedSize(300, 150)
@@ -20,7 +22,7 @@ class KeyBindingDialog(QDialog):
         layout = QFormLayout()
 
         self.effect_combo = QComboBox()
-        self.effect_combo.addItems(["Fireworks", "Sparkles", "Fire", "Rainbow Trail"])
+        self.effect_combo.addItems(effect_names)
         layout.addRow("Select Effect:", self.effect_combo)
 
         self.key_input = QLineEdit()
@@ -49,21 +51,58 @@ class HandMagicApp(QMainWindow):
         self.setWindowTitle("HandMagic - Gesture Effects App")
         self.setGeometry(100, 100, 1000, 700)
 
-        # Initialize effects
-        self.fire_effect = fire.FireEffect()
-        self.sparkles_effect = sparkles.SparklesEffect()
-        self.fireworks_effect = fireworks.FireworksEffect()
-        self.rainbow_effect = rainbow.RainbowEffect()
+        # Effects are created on first selection and released when switching away
+        self.effect_registry = registry.create_default_registry()
         self.current_effect = None
         self.effect_intensity = 50
+        # One timestamp per frame for every effect; effects simulate at a fixed rate
+        self.frame_clock = clock.FrameClock()
 
         # Image adjustment settings
         self.brightness_adjust = 0
         self.contrast_adjust = 1.0
+        # Mirror, adjust and convert each frame into reused buffers
+        self.preprocessor = preprocess.FramePreprocessor(flip=True)
 
         # Hand tracking
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        # Every tracked hand gets its own effect state
+        self.max_num_hands = 2
+        self.hands = self.mp_hands.Hands(max_num_hands=self.max_num_hands,
+                                         min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        # Inference resolution is independent of the capture resolution below
+        self.inference_size = 640
+        self.inference_roi = False
+        # Crops move with the hands, so they get their own detector without tracking
+        self.roi_hands = self.mp_hands.Hands(static_image_mode=True, max_num_hands=self.max_num_hands,
+                                             min_detection_confidence=0.7) if self.inference_roi else None
+        self.roi_processor = roi.HandRoiProcessor(self.hands, max_size=self.inference_size, roi=self.inference_roi,
+                                                  roi_hands=self.roi_hands)
+        # Run inference every Nth frame and predict landmarks in between
+        self.inference_every_n = 1
+        self.hand_processor = landmark_filter.PredictiveHands(self.roi_processor, every_n=self.inference_every_n)
+        # Record landmarks to a file, or replay a recording instead of running MediaPipe
+        self.record_landmarks_path = None
+        self.replay_landmarks_path = None
+        if self.replay_landmarks_path:
+            self.hand_processor = replay.ReplayHands(self.replay_landmarks_path, realtime=True, loop=True)
+        elif self.record_landmarks_path:
+            self.hand_processor = replay.RecordingHands(self.hand_processor, self.record_landmarks_path,
+                                                       max_hands=self.max_num_hands)
+        # Inference runs on its own thread; the GUI only composites and displays
+        self.inference = inference.InferenceWorker(self.hand_processor)
+        self.gesture_engine = gestures.GestureEngine()
+
+        # Per-stage frame timing
+        self.frame_timer = timing.FrameTimer()
+        self.show_hud = False
+
+        # Lower effect quality automatically when frames exceed the budget
+        self.quality_governor = governor.QualityGovernor(target_fps=30)
+        self.quality = self.quality_governor.settings()
+
+        # Display
+        self.use_opengl = False
 
         # Camera
         self.cap = None
@@ -85,15 +124,14 @@ class HandMagicApp(QMainWindow):
         main_widget = QWidget()
         main_layout = QHBoxLayout()
 
-        self.video_label = QLabel()
-        self.video_label.setAlignment(Qt.AlignCenter)
-        self.video_label.setMinimumSize(640, 480)
+        # Paints the frame buffer directly; use_opengl uploads it as a texture instead
+        self.video_widget = create_video_widget(opengl=self.use_opengl)
 
         control_panel = QGroupBox("Effect Controls")
         control_layout = QVBoxLayout()
 
         self.effect_combo = QComboBox()
-        self.effect_combo.addItems(["No Effect", "Fireworks", "Sparkles", "Fire", "Rainbow Trail"])
+        self.effect_combo.addItems(["No Effect"] + self.effect_registry.names())
         self.effect_combo.currentTextChanged.connect(self.change_effect)
 
         intensity_label = QLabel("Effect Intensity:")
@@ -114,6 +152,8 @@ class HandMagicApp(QMainWindow):
         self.contrast_slider.setValue(self.settings.value("contrast", 100, type=int))
         self.contrast_slider.valueChanged.connect(self.update_camera_settings)
         self.contrast_adjust = self.contrast_slider.value() / 100
+        self.brightness_adjust = self.brightness_slider.value()
+        self.preprocessor.set_adjustment(self.contrast_adjust, self.brightness_adjust)
 
         reset_btn = QPushButton("Reset Adjustments")
         reset_btn.clicked.connect(lambda: [
@@ -125,6 +165,9 @@ class HandMagicApp(QMainWindow):
         self.info_label = QLabel("Make gestures in front of the camera")
         self.info_label.setAlignment(Qt.AlignCenter)
 
+        self.quality_label = QLabel()
+        self.quality_label.setAlignment(Qt.AlignCenter)
+
         control_layout.addWidget(QLabel("Select Effect:"))
         control_layout.addWidget(self.effect_combo)
         control_layout.addWidget(intensity_label)
@@ -135,6 +178,7 @@ class HandMagicApp(QMainWindow):
         control_layout.addWidget(self.contrast_slider)
         control_layout.addWidget(reset_btn)
         control_layout.addWidget(self.info_label)
+        control_layout.addWidget(self.quality_label)
         control_layout.addStretch()
 
         self.start_btn = QPushButton("Start Camera")
@@ -149,7 +193,7 @@ class HandMagicApp(QMainWindow):
         control_layout.addLayout(button_layout)
 
         control_panel.setLayout(control_layout)
-        main_layout.addWidget(self.video_label, 70)
+        main_layout.addWidget(self.video_widget, 70)
         main_layout.addWidget(control_panel, 30)
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
@@ -163,8 +207,18 @@ class HandMagicApp(QMainWindow):
         keybind_action.triggered.connect(self.configure_key_bindings)
         settings_menu.addAction(keybind_action)
 
+        self.hud_action = QAction("Show Performance HUD", self, checkable=True)
+        self.hud_action.toggled.connect(self.toggle_hud)
+        settings_menu.addAction(self.hud_action)
+
+        self.csv_action = QAction("Record Timings to CSV...", self, checkable=True)
+        self.csv_action.toggled.connect(self.toggle_timing_csv)
+        settings_menu.addAction(self.csv_action)
+
         self.setMenuBar(menu_bar)
 
+        self.quality_governor.on_change(self.apply_quality)
+
     def init_camera(self):
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
@@ -172,14 +226,15 @@ class HandMagicApp(QMainWindow):
     def start_camera(self):
         try:
             if not self.cap or not self.cap.isOpened():
-                self.cap = cv2.VideoCapture(0)
+                self.cap = capture.ThreadedCapture(0, width=self.cam_width, height=self.cam_height).start()
                 if not self.cap.isOpened():
                     raise RuntimeError("Could not open camera")
 
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.cam_width)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.cam_height)
                 self.update_camera_settings(hardware_only=True)
 
+            self.inference.start()
+            # Time spent stopped is not simulated
+            self.frame_clock.reset()
             self.timer.start(20)
             self.start_btn.setEnabled(False)
             self.stop_btn.setEnabled(True)
@@ -191,64 +246,100 @@ class HandMagicApp(QMainWindow):
 
     def stop_camera(self):
         self.timer.stop()
-        self.video_label.clear()
+        self.video_widget.clear()
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.statusBar().showMessage("Camera stopped")
 
     def update_frame(self):
         try:
-            ret, frame = self.cap.read()
+            timer = self.frame_timer
+            timer.begin_frame()
+            # Never block the GUI thread: skip the tick if no new frame arrived yet
+            with timer.stage("capture"):
+                ret, frame = self.cap.read(timeout=0)
             if not ret:
-                self.statusBar().showMessage("Failed to capture frame")
+                if not self.cap.isOpened():
+                    self.statusBar().showMessage("Failed to capture frame")
                 return
 
-            frame = self.adjust_image(frame, self.contrast_adjust, self.brightness_adjust)
-            frame = cv2.flip(frame, 1)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-            results = self.hands.process(frame_rgb)
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    palm_landmarks = [0, 1, 2, 5, 9, 13, 17]
-                    palm_x = int(sum(hand_landmarks.landmark[i].x for i in palm_landmarks) / len(palm_landmarks) * self.cam_width)
-                    palm_y = int(sum(hand_landmarks.landmark[i].y for i in palm_landmarks) / len(palm_landmarks) * self.cam_height)
-
-                    index_tip_x = int(hand_landmarks.landmark[8].x * self.cam_width)
-                    index_tip_y = int(hand_landmarks.landmark[8].y * self.cam_height)
-                    self.rainbow_effect.update_trail(index_tip_x, index_tip_y)
-
-                    if self.is_hand_open(hand_landmarks):
+            # The previous frame was painted since the last processed frame; report it with this one.
+            # Taken only now, so ticks without a new frame don't discard the sample.
+            display_timings = self.video_widget.take_timings()
+            if display_timings is not None:
+                timer.record("paint", display_timings[0])
+                timer.record("display lag", display_timings[1])
+
+            # frame_rgb comes from a pool and is not reused while the worker still holds it
+            with timer.stage("preprocess"):
+                frame_bgr, frame_rgb = self.preprocessor.process(frame)
+            # Render this frame with the newest landmarks while it is being inferred
+            with timer.stage("inference"):
+                self.inference.submit(frame_rgb)
+                results = self.inference.latest()
+
+            # Landmarks are normalized, so scale by the actual frame size
+            frame_h, frame_w = frame_bgr.shape[:2]
+            effect_stage = f"effect:{self.current_effect}"
+
+            detected = []
+            if results is not None and results.multi_hand_landmarks:
+                with timer.stage("gestures"):
+                    detected = self.gesture_engine.update(results, frame_w, frame_h)
+                for hand in detected:
+                    if hand.is_open:
                         self.info_label.setText("Hand open - effect active!")
-
-                        if self.current_effect == "Fireworks":
-                            frame_bgr = self.fireworks_effect.draw_firework(frame_bgr, palm_x, palm_y, size=self.effect_intensity)
-                        elif self.current_effect == "Sparkles":
-                            frame_bgr = self.sparkles_effect.draw_sparkles(frame_bgr, palm_x, palm_y, intensity=self.effect_intensity / 100)
-                        elif self.current_effect == "Fire":
-                            frame_bgr = self.fire_effect.draw_fire(frame_bgr, palm_x, palm_y, size=self.effect_intensity * 2)
                     else:
                         self.info_label.setText("Close your hand to activate effects")
 
-            if self.current_effect == "Rainbow Trail":
-                frame_bgr = self.rainbow_effect.draw_rainbow_trail(frame_bgr)
+            self.frame_clock.tick()
+            effect = self.effect_registry.active
+            if effect is not None:
+                with timer.stage(effect_stage):
+                    effect.advance(self.frame_clock, detected)
+                    frame_bgr = effect.render(frame_bgr)
+
+            if self.show_hud:
+                timer.draw_hud(frame_bgr)
+                if timer.frame_index % 30 == 0:
+                    self.statusBar().showMessage(timer.status_text())
 
-            h, w, ch = frame_bgr.shape
-            bytes_per_line = ch * w
-            q_img = QImage(frame_bgr.data, w, h, bytes_per_line, QImage.Format_BGR888)
-            self.video_label.setPixmap(QPixmap.fromImage(q_img))
+            with timer.stage("display"):
+                self.video_widget.set_frame(frame_bgr)
+            timer.end_frame()
+            self.quality_governor.update(timer.current["total"])
 
         except Exception as e:
             self.statusBar().showMessage(f"Error: {str(e)}")
             self.stop_camera()
 
-    def adjust_image(self, img, contrast=1.0, brightness=0):
-        return cv2.convertScaleAbs(img, alpha=contrast, beta=brightness)
+    def toggle_hud(self, checked):
+        self.show_hud = checked
+
+    def toggle_timing_csv(self, checked):
+        if not checked:
+            self.frame_timer.stop_csv()
+            self.statusBar().showMessage("Stopped recording timings")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Record Timings", "frame_timings.csv", "CSV files (*.csv)")
+        if not path:
+            self.csv_action.setChecked(False)
+            return
+        self.frame_timer.start_csv(path)
+        self.statusBar().showMessage(f"Recording timings to {path}")
+
+    def apply_quality(self, settings):
+        self.quality = settings
+        if self.effect_registry.active is not None:
+            self.effect_registry.active.set_quality(settings)
+        self.roi_processor.max_size = int(self.inference_size * settings["inference"])
+        self.quality_label.setText(f"Quality: {settings['name']}")
 
     def update_camera_settings(self, hardware_only=False):
         self.brightness_adjust = self.brightness_slider.value()
         self.contrast_adjust = self.contrast_slider.value() / 100
+        self.preprocessor.set_adjustment(self.contrast_adjust, self.brightness_adjust)
 
         if hasattr(self, 'cap') and self.cap.isOpened():
             self.cap.set(cv2.CAP_PROP_BRIGHTNESS, self.brightness_adjust / 100)
@@ -259,25 +350,22 @@ class HandMagicApp(QMainWindow):
                 f"Brightness: {self.brightness_adjust}%, Contrast: {int(self.contrast_adjust * 100)}%"
             )
 
-    def is_hand_open(self, hand_landmarks):
-        finger_tips = [8, 12, 16, 20]
-        finger_bases = [6, 10, 14, 18]
-        open_fingers = sum(hand_landmarks.landmark[tip].y < hand_landmarks.landmark[base].y
-                           for tip, base in zip(finger_tips, finger_bases))
-        return open_fingers >= 3
-
     def change_effect(self, effect_name):
         self.current_effect = effect_name if effect_name != "No Effect" else None
-        if effect_name != "Rainbow Trail":
-            self.rainbow_effect.clear_trail()
+        effect = self.effect_registry.select(self.current_effect)
+        if effect is not None:
+            effect.set_intensity(self.effect_intensity)
+            effect.set_quality(self.quality)
         self.statusBar().showMessage(f"Effect changed to: {effect_name}")
 
     def update_intensity(self, value):
         self.effect_intensity = value
+        if self.effect_registry.active is not None:
+            self.effect_registry.active.set_intensity(value)
         self.statusBar().showMessage(f"Effect intensity: {value}%")
 
     def configure_key_bindings(self):
-        dialog = KeyBindingDialog(self)
+        dialog = KeyBindingDialog(self.effect_registry.names(), self)
         if dialog.exec_():
             effect, key = dialog.get_binding()
             if key.isdigit() and 1 <= int(key) <= 9:
@@ -297,6 +385,11 @@ class HandMagicApp(QMainWindow):
 
     def closeEvent(self, event):
         self.stop_camera()
+        self.inference.stop()
+        self.effect_registry.release_all()
+        self.frame_timer.stop_csv()
+        if isinstance(self.hand_processor, replay.RecordingHands):
+            self.hand_processor.save()
         if self.cap:
             self.cap.release()
         self.settings.setValue("brightness", self.brightness_slider.value())
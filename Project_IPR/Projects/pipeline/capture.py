@@ -0,0 +1,165 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class ThreadedCapture:
+    def __init__(self, source=0, width=None, height=None, buffer_size=3, drop_frames=True):
+        """
+        Camera / video capture that grabs on a dedicated thread.
+
+        Frames are decoded into a small preallocated ring buffer and `read()`
+        always returns the newest one, so the processing loop never waits on
+        camera I/O and never sees stale frames queued in the driver. The
+        public methods mirror `cv2.VideoCapture` so it can be used in its place.
+
+        Args:
+            source (int | str): Device index or video file path
+            width (int, optional): Requested capture width
+            height (int, optional): Requested capture height
+            buffer_size (int): Number of ring buffer slots (at least 3)
+            drop_frames (bool): Skip frames the consumer did not pick up in
+                time (live cameras). When False the grabber waits for the
+                consumer, which suits video files.
+        """
+        self.source = source
+        self.width = width
+        self.height = height
+        self.buffer_size = max(3, buffer_size)
+        self.drop_frames = drop_frames
+
+        self.cap = None
+        self.buffers = []
+        self.latest = None       # slot holding the newest frame
+        self.reading = None      # slot currently handed to the consumer
+        self.sequence = 0        # frames grabbed so far
+        self.consumed = 0        # sequence number of the last frame handed out
+        self.dropped = 0         # frames overwritten before being read
+        self.pending = {}        # property changes for the grabber thread to apply
+
+        self._condition = threading.Condition()
+        # cv2.VideoCapture is not thread-safe: only one thread may use it at a time
+        self._cap_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Open the source, preallocate the ring buffer and start grabbing"""
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            return self
+
+        if self.width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+        ret, frame = self.cap.read()
+        if not ret:
+            self.cap.release()
+            return self
+
+        self.buffers = [np.empty_like(frame) for _ in range(self.buffer_size)]
+        self.buffers[0][...] = frame
+        self.latest = 0
+        self.sequence = 1
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _next_slot(self):
+        for slot in range(self.buffer_size):
+            if slot != self.latest and slot != self.reading:
+                return slot
+
+    def _run(self):
+        while self._running:
+            with self._condition:
+                if not self.drop_frames:
+                    while self._running and self.consumed < self.sequence:
+                        self._condition.wait()
+                slot = self._next_slot()
+                pending, self.pending = self.pending, {}
+
+            with self._cap_lock:
+                for prop_id, value in pending.items():
+                    self.cap.set(prop_id, value)
+                ret, frame = self.cap.read(self.buffers[slot])
+
+            with self._condition:
+                if not ret:
+                    self._running = False
+                    self._condition.notify_all()
+                    break
+                if frame is not self.buffers[slot]:
+                    # Resolution changed, the decoder allocated a new image
+                    self.buffers[slot] = frame
+                if self.consumed < self.sequence:
+                    self.dropped += 1
+                self.latest = slot
+                self.sequence += 1
+                self._condition.notify_all()
+
+    def read(self, timeout=1.0):
+        """
+        Get the newest frame, waiting for one newer than the last returned.
+
+        The returned array is owned by the ring buffer and stays valid until
+        the next call to `read()`.
+
+        Returns:
+            tuple: (ret, frame) like `cv2.VideoCapture.read`
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: self.consumed < self.sequence or not self._running, timeout):
+                return False, None
+            if self.consumed >= self.sequence:
+                return False, None
+            self.reading = self.latest
+            self.consumed = self.sequence
+            self._condition.notify_all()
+            return True, self.buffers[self.reading]
+
+    def isOpened(self):
+        return self._running or (self.consumed < self.sequence)
+
+    def set(self, prop_id, value):
+        """
+        Set a capture property. While grabbing, the change is queued and
+        applied by the grabber thread before its next read (so the caller
+        never waits for a frame), and True only means it was queued.
+        """
+        if self.cap is None:
+            return False
+        with self._condition:
+            if self._running:
+                self.pending[prop_id] = value
+                return True
+        with self._cap_lock:
+            return self.cap.set(prop_id, value)
+
+    def get(self, prop_id):
+        if self.cap is None:
+            return 0
+        with self._cap_lock:
+            return self.cap.get(prop_id)
+
+    def release(self):
+        """Stop the grabber thread and release the device"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            with self._cap_lock:
+                self.cap.release()
+
+    def stats(self):
+        """Get capture counters as a dict"""
+        return {"grabbed": self.sequence, "dropped": self.dropped}
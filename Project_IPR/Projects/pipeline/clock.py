@@ -0,0 +1,65 @@
+import time
+
+SIMULATION_RATE = 30   # fixed simulation steps per second
+
+
+class FrameClock:
+    def __init__(self, step=1.0 / SIMULATION_RATE, max_steps=5, time_source=time.monotonic):
+        """
+        One shared timestamp per frame plus a fixed-timestep accumulator.
+
+        Call `tick()` once per rendered frame. Every effect reads the frame's
+        time from the clock instead of the wall clock, and simulations advance
+        by `steps` steps of exactly `step` seconds, so motion no longer
+        depends on how many frames are rendered. `alpha` (0-1) is how far the
+        frame lies between the last two simulation states, for interpolating
+        what is drawn.
+
+        Args:
+            step (float): Simulation timestep in seconds
+            max_steps (int): Maximum steps per frame; after a longer stall the
+                extra time is dropped instead of being caught up
+            time_source: Callable returning seconds, e.g. a video's timestamps
+                when rendering offline
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.time_source = time_source
+
+        self.now = None
+        self.dt = 0.0
+        self.steps = 0
+        self.accumulator = 0.0
+        self.frame_index = -1
+
+    def tick(self, now=None):
+        """
+        Start a new frame at `now` seconds (default: the time source).
+
+        Returns:
+            int: Number of fixed steps to simulate this frame
+        """
+        now = self.time_source() if now is None else now
+        self.dt = 0.0 if self.now is None else max(0.0, now - self.now)
+        self.now = now
+        self.frame_index += 1
+
+        self.accumulator += min(self.dt, self.max_steps * self.step)
+        self.steps = int(self.accumulator / self.step)
+        self.accumulator -= self.steps * self.step
+        return self.steps
+
+    @property
+    def now_ms(self):
+        return self.now * 1000
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step
+
+    def reset(self):
+        self.now = None
+        self.dt = 0.0
+        self.steps = 0
+        self.accumulator = 0.0
+        self.frame_index = -1
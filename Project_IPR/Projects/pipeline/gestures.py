@@ -0,0 +1,133 @@
+import numpy as np
+
+from .landmarks import results_to_arrays
+
+FINGER_TIPS = [8, 12, 16, 20]       # index, middle, ring, pinky tips
+FINGER_PIPS = [6, 10, 14, 18]       # the joints below them
+PALM_LANDMARKS = [0, 1, 2, 5, 9, 13, 17]
+WRIST, THUMB_IP, THUMB_TIP, INDEX_TIP, MIDDLE_TIP = 0, 3, 4, 8, 12
+
+
+class HandGestures:
+    """Gesture readout for one hand in one frame."""
+
+    def __init__(self, label, normalized, points):
+        self.label = label
+        self.normalized = normalized    # (21, 3) normalized landmarks
+        self.points = points            # (21, 2) pixel coordinates
+        self.is_open = False
+        self.open_after_close = False
+        self.index_only = False
+        self.pinch = False
+        self.hand_size = 0.0
+        self.palm_center = (0, 0)
+        self.index_tip = (0, 0)
+        self.values = {}                # results of custom gestures
+
+
+class _HandState:
+    def __init__(self):
+        self.is_open = False
+        self.closed_before = True
+        self.pending = None
+        self.pending_frames = 0
+
+
+class GestureEngine:
+    def __init__(self, debounce_frames=1, pinch_ratio=0.25):
+        """
+        Evaluate hand gestures for all hands in one vectorized pass.
+
+        Args:
+            debounce_frames (int): Frames the raw open/closed reading must hold
+                before a hand's state switches (1 = switch immediately)
+            pinch_ratio (float): Thumb-index distance, relative to hand size,
+                below which the hand counts as pinching
+        """
+        self.debounce_frames = max(1, debounce_frames)
+        self.pinch_ratio = pinch_ratio
+        self.custom = {}
+        self.states = {}
+
+    def register(self, name, fn):
+        """
+        Register a custom gesture. `fn(normalized, pixels)` receives arrays of
+        shape (hands, 21, 3) and (hands, 21, 2) and returns one value per hand,
+        exposed as `HandGestures.values[name]`.
+        """
+        self.custom[name] = fn
+
+    def reset(self):
+        self.states.clear()
+
+    def update(self, results, frame_width, frame_height):
+        """
+        Evaluate every gesture for every hand in `Hands.process` results.
+
+        Returns:
+            list: One `HandGestures` per detected hand
+        """
+        normalized, labels, _ = results_to_arrays(results)
+        if len(normalized) == 0:
+            return []
+        return self.evaluate(normalized, labels, frame_width, frame_height)
+
+    def evaluate(self, normalized, labels, frame_width, frame_height):
+        """Same as `update` for landmarks already stacked in a (hands, 21, 3) array"""
+        pixels = normalized[..., :2] * np.array([frame_width, frame_height], np.float32)
+
+        extended = normalized[:, FINGER_TIPS, 1] < normalized[:, FINGER_PIPS, 1]
+        is_open = extended.sum(axis=1) >= 3
+        thumb_out = normalized[:, THUMB_TIP, 0] < normalized[:, THUMB_IP, 0]
+        index_only = ~thumb_out & extended[:, 0] & ~extended[:, 1:].any(axis=1)
+
+        hand_size = np.linalg.norm(pixels[:, MIDDLE_TIP] - pixels[:, WRIST], axis=1)
+        pinch_dist = np.linalg.norm(pixels[:, THUMB_TIP] - pixels[:, INDEX_TIP], axis=1)
+        pinch = pinch_dist < self.pinch_ratio * hand_size
+        palm_center = pixels[:, PALM_LANDMARKS].mean(axis=1).astype(int)
+        index_tip = pixels[:, INDEX_TIP].astype(int)
+
+        custom = {name: fn(normalized, pixels) for name, fn in self.custom.items()}
+
+        hands = []
+        seen = set()
+        for i, label in enumerate(labels):
+            if label in seen:
+                label = f"{label}:{i}"
+            seen.add(label)
+
+            hand = HandGestures(label, normalized[i], pixels[i])
+            hand.open_after_close = self._update_state(label, bool(is_open[i]))
+            hand.is_open = self.states[label].is_open
+            hand.index_only = bool(index_only[i])
+            hand.pinch = bool(pinch[i])
+            hand.hand_size = float(hand_size[i])
+            hand.palm_center = tuple(palm_center[i].tolist())
+            hand.index_tip = tuple(index_tip[i].tolist())
+            hand.values = {name: values[i] for name, values in custom.items()}
+            hands.append(hand)
+        return hands
+
+    def _update_state(self, label, raw_open):
+        """Debounce the open/closed reading and report a closed -> open edge"""
+        state = self.states.get(label)
+        if state is None:
+            state = self.states[label] = _HandState()
+
+        if raw_open != state.is_open:
+            if state.pending != raw_open:
+                state.pending, state.pending_frames = raw_open, 0
+            state.pending_frames += 1
+            if state.pending_frames >= self.debounce_frames:
+                state.is_open = raw_open
+                state.pending = None
+        else:
+            state.pending = None
+
+        opened_after_close = False
+        if state.is_open:
+            opened_after_close = state.closed_before
+            state.closed_before = False
+        else:
+            state.closed_before = True
+        return opened_after_close
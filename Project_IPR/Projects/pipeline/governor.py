@@ -0,0 +1,102 @@
+QUALITY_LEVELS = [
+    # name, particles, trail length, sprite cache resolution, inference resolution
+    {"name": "Minimum", "particles": 0.25, "trail": 0.4, "sprites": 0.5, "inference": 0.5},
+    {"name": "Low", "particles": 0.5, "trail": 0.6, "sprites": 0.7, "inference": 0.6},
+    {"name": "Medium", "particles": 0.75, "trail": 0.8, "sprites": 0.85, "inference": 0.8},
+    {"name": "High", "particles": 1.0, "trail": 1.0, "sprites": 1.0, "inference": 1.0},
+]
+
+
+class QualityGovernor:
+    def __init__(self, target_fps=30, levels=QUALITY_LEVELS, smoothing=0.1,
+                 upper=1.0, lower=0.7, down_frames=10, up_frames=60, cooldown_frames=30):
+        """
+        Scale effect quality to keep frame time within a frame-rate budget.
+
+        Frame times are smoothed with an exponential moving average. Quality
+        drops one level after the average stays above `upper` x budget for
+        `down_frames` frames, and rises one level after it stays below
+        `lower` x budget for `up_frames` frames. No change happens within
+        `cooldown_frames` of the previous one, so the level doesn't oscillate.
+
+        Args:
+            target_fps (float): Frame rate to hold
+            levels (list): Quality levels from lowest to highest; each is a dict
+                of scale factors (1.0 = full quality) plus a "name"
+            smoothing (float): EMA weight of the newest frame time
+        """
+        self.levels = levels
+        self.level = len(levels) - 1
+        self.smoothing = smoothing
+        self.upper = upper
+        self.lower = lower
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.cooldown_frames = cooldown_frames
+        self.set_target_fps(target_fps)
+
+        self.average = None
+        self.over = 0
+        self.under = 0
+        self.cooldown = 0
+        self.listeners = []
+
+    def set_target_fps(self, target_fps):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+
+    def on_change(self, callback):
+        """Call `callback(settings)` now and whenever the quality level changes"""
+        self.listeners.append(callback)
+        callback(self.settings())
+
+    def settings(self):
+        return self.levels[self.level]
+
+    @property
+    def level_name(self):
+        return self.settings()["name"]
+
+    @property
+    def degraded(self):
+        return self.level < len(self.levels) - 1
+
+    def update(self, frame_seconds):
+        """
+        Feed one measured frame time.
+
+        Returns:
+            bool: True if the quality level changed
+        """
+        if self.average is None:
+            self.average = frame_seconds
+        else:
+            self.average += self.smoothing * (frame_seconds - self.average)
+
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+
+        if self.average > self.upper * self.budget:
+            self.over += 1
+            self.under = 0
+        elif self.average < self.lower * self.budget:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.down_frames and self.level > 0:
+            return self._set_level(self.level - 1)
+        if self.under >= self.up_frames and self.level < len(self.levels) - 1:
+            return self._set_level(self.level + 1)
+        return False
+
+    def _set_level(self, level):
+        self.level = level
+        self.over = self.under = 0
+        self.cooldown = self.cooldown_frames
+        settings = self.settings()
+        for callback in self.listeners:
+            callback(settings)
+        return True
@@ -0,0 +1,104 @@
+import threading
+import time
+
+
+class LatestSlot:
+    """
+    Single-value mailbox where writers overwrite and readers see the newest value.
+
+    Publishing is one reference assignment, which is atomic in CPython, so
+    neither side takes a lock or waits on the other.
+    """
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def put(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+
+class InferenceWorker:
+    def __init__(self, hands):
+        """
+        Run `hands.process` on a worker thread, pipelined with rendering.
+
+        The caller submits frame N and renders it with the newest results
+        already available (usually from frame N-1) while frame N is being
+        inferred. Pending frames are overwritten, never queued, so inference
+        always works on the freshest frame.
+
+        Args:
+            hands: Object with a MediaPipe style `process(rgb_frame)` method
+        """
+        self.hands = hands
+        self.pending = LatestSlot()   # (frame_id, rgb_frame, submit_time)
+        self.results = LatestSlot()   # (frame_id, results, latency)
+
+        self.submitted = 0
+        self.processed = 0
+        self.skipped = 0
+
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        last_id = -1
+        while self._running:
+            self._wake.wait(0.1)
+            self._wake.clear()
+            job = self.pending.get()
+            if job is None or job[0] == last_id:
+                continue
+
+            frame_id, rgb_frame, submit_time = job
+            if last_id >= 0:
+                self.skipped += frame_id - last_id - 1
+            last_id = frame_id
+
+            results = self.hands.process(rgb_frame)
+            self.processed += 1
+            self.results.put((frame_id, results, time.monotonic() - submit_time))
+
+    def submit(self, rgb_frame):
+        """
+        Queue a frame for inference, replacing any frame not yet picked up.
+
+        The worker takes ownership of `rgb_frame`; the caller must not modify it afterwards.
+
+        Returns:
+            int: The id assigned to the frame
+        """
+        self.submitted += 1
+        self.pending.put((self.submitted, rgb_frame, time.monotonic()))
+        self._wake.set()
+        return self.submitted
+
+    def latest(self):
+        """Get the newest available results, or None before the first inference finishes"""
+        item = self.results.get()
+        return None if item is None else item[1]
+
+    def latest_latency(self):
+        """Seconds between submitting and finishing the frame behind `latest()`"""
+        item = self.results.get()
+        return None if item is None else item[2]
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.pending.put(None)
+        self.results.put(None)
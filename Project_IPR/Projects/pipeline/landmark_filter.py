@@ -0,0 +1,157 @@
+import math
+import time
+
+import numpy as np
+
+from .landmarks import arrays_to_results, results_to_arrays
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.7, beta=0.3, d_cutoff=1.0):
+        """
+        One-Euro filter over a whole landmark array at once.
+
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) at rest; lower is smoother
+            beta (float): How fast the cutoff rises with speed; higher is less laggy
+            d_cutoff (float): Cutoff frequency (Hz) for the velocity estimate
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, x, t):
+        if self.x is None or t <= self.t:
+            if self.x is None:
+                self.dx = np.zeros_like(x)
+            self.x, self.t = x, t
+            return x
+
+        dt = t - self.t
+        dx = (x - self.x) / dt
+        self.dx = self.dx + self._alpha(dt, self.d_cutoff) * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.x = self.x + a * (x - self.x)
+        self.t = t
+        return self.x
+
+    def predict(self, t):
+        """Extrapolate with the filtered velocity"""
+        return self.x + self.dx * (t - self.t)
+
+
+class ConstantVelocityFilter:
+    """Pass samples through unchanged and extrapolate with the last velocity."""
+
+    def __init__(self):
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    def update(self, x, t):
+        if self.x is not None and t > self.t:
+            self.dx = (x - self.x) / (t - self.t)
+        elif self.dx is None:
+            self.dx = np.zeros_like(x)
+        self.x, self.t = x, t
+        return x
+
+    def predict(self, t):
+        return self.x + self.dx * (t - self.t)
+
+
+class PredictiveHands:
+    def __init__(self, hands, every_n=1, inference_share=None, smoothing="velocity", max_prediction=0.25):
+        """
+        Wrap a `Hands`-like object so inference only runs on some frames and
+        landmarks for the other frames are predicted from a per-hand filter.
+
+        Args:
+            hands: Object with a MediaPipe style `process(rgb_frame)` method
+            every_n (int): Run inference on every n-th frame (1 = every frame)
+            inference_share (float, optional): Instead of a fixed cadence, run
+                inference whenever doing so keeps the time spent in it below this
+                fraction of wall time (e.g. 0.5)
+            smoothing (str): "velocity" (constant-velocity extrapolation) or
+                "one_euro" (One-Euro smoothing plus extrapolation)
+            max_prediction (float): Seconds after which predictions are dropped
+        """
+        self.hands = hands
+        self.every_n = max(1, every_n)
+        self.inference_share = inference_share
+        self.smoothing = smoothing
+        self.max_prediction = max_prediction
+
+        self.frame_count = 0
+        self.inferred = 0
+        self.predicted = 0
+        self.filters = {}          # handedness label -> filter
+        self.labels = []
+        self.scores = []
+        self.last_inference_start = None
+        self.last_inference_cost = 0.0
+
+    def _new_filter(self):
+        return OneEuroFilter() if self.smoothing == "one_euro" else ConstantVelocityFilter()
+
+    def _should_infer(self, now):
+        if self.last_inference_start is None or not self.filters:
+            return True
+        if self.inference_share is not None:
+            elapsed = now - self.last_inference_start
+            return self.last_inference_cost <= self.inference_share * elapsed
+        return self.frame_count % self.every_n == 0
+
+    def process(self, rgb_frame, timestamp=None):
+        now = time.monotonic() if timestamp is None else timestamp
+        self.frame_count += 1
+
+        if self._should_infer(now):
+            return self._infer(rgb_frame, now)
+        return self.predict(now)
+
+    def _infer(self, rgb_frame, now):
+        start = time.monotonic()
+        results = self.hands.process(rgb_frame)
+        self.last_inference_start = start
+        self.last_inference_cost = time.monotonic() - start
+        self.inferred += 1
+
+        points, labels, scores = results_to_arrays(results)
+        filters = {}
+        for i, (hand, label) in enumerate(zip(points, labels)):
+            if label in filters:
+                # Both hands reported with the same handedness
+                label = labels[i] = f"{label}:{i}"
+            f = self.filters.get(label) or self._new_filter()
+            hand[:] = f.update(hand.astype(np.float64), now)
+            filters[label] = f
+        self.filters = filters
+        self.labels, self.scores = labels, scores
+
+        if self.smoothing == "one_euro" and len(points):
+            return arrays_to_results(points, labels, scores)
+        return results
+
+    def predict(self, now):
+        """Predict landmarks for every tracked hand at time `now`"""
+        self.predicted += 1
+        if not self.filters:
+            return arrays_to_results([])
+
+        label_order = [label for label in self.labels if label in self.filters]
+        if now - self.filters[label_order[0]].t > self.max_prediction:
+            return arrays_to_results([])
+
+        points = [self.filters[label].predict(now) for label in label_order]
+        return arrays_to_results(points, label_order, self.scores)
@@ -0,0 +1,84 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+class Landmark:
+    """Plain stand-in for a MediaPipe NormalizedLandmark."""
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class HandLandmarks:
+    """Plain stand-in for a MediaPipe NormalizedLandmarkList."""
+
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+class Classification:
+    def __init__(self, label, score=1.0, index=0):
+        self.label = label
+        self.score = score
+        self.index = index
+
+
+class Handedness:
+    def __init__(self, classification):
+        self.classification = classification
+
+
+class HandResults:
+    """
+    Object shaped like the result of `Hands.process`, so code that reads
+    `multi_hand_landmarks` / `multi_handedness` works with predicted or
+    replayed landmarks too. Both fields are None when there are no hands.
+    """
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None):
+        self.multi_hand_landmarks = multi_hand_landmarks or None
+        self.multi_handedness = multi_handedness or None
+        self.multi_hand_world_landmarks = None
+
+
+def landmarks_to_array(hand_landmarks):
+    """Convert one hand's landmarks to a (21, 3) float32 array of normalized x, y, z"""
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+def results_to_arrays(results):
+    """
+    Convert `Hands.process` results to arrays.
+
+    Returns:
+        tuple: (points, labels, scores) with points of shape (hands, 21, 3)
+    """
+    if results is None or not results.multi_hand_landmarks:
+        return np.zeros((0, NUM_LANDMARKS, 3), np.float32), [], []
+
+    points = np.stack([landmarks_to_array(hand) for hand in results.multi_hand_landmarks])
+    labels, scores = [], []
+    for i in range(len(points)):
+        if results.multi_handedness and i < len(results.multi_handedness):
+            c = results.multi_handedness[i].classification[0]
+            labels.append(c.label)
+            scores.append(c.score)
+        else:
+            labels.append(str(i))
+            scores.append(1.0)
+    return points, labels, scores
+
+
+def arrays_to_results(points, labels=None, scores=None):
+    """Build a `HandResults` from a (hands, 21, 3) array"""
+    hands, handedness = [], []
+    for i, hand in enumerate(np.asarray(points, dtype=np.float64)):
+        hands.append(HandLandmarks([Landmark(x, y, z) for x, y, z in hand.tolist()]))
+        label = labels[i] if labels else str(i)
+        score = scores[i] if scores else 1.0
+        handedness.append(Handedness([Classification(label, score, i)]))
+    return HandResults(hands, handedness)
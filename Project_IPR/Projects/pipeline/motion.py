@@ -0,0 +1,247 @@
+import itertools
+import math
+from collections import deque
+
+import numpy as np
+
+
+def _step_angle(p1, p2, center):
+    """Signed angle in (-pi, pi] from p1 to p2 around center, computed like detect_circular_motion"""
+    angle = math.atan2(p2[1] - center[1], p2[0] - center[0]) - math.atan2(p1[1] - center[1], p1[0] - center[0])
+    angle = (angle + math.pi * 2) % (math.pi * 2)
+    return angle - 2 * math.pi if angle > math.pi else angle
+
+
+class _SlidingMax:
+    """Maximum of the values pushed since a given index, O(1) amortized per push"""
+
+    def __init__(self):
+        self.items = deque()   # (index, value), values decreasing
+
+    def clear(self):
+        self.items.clear()
+
+    def push(self, index, value):
+        while self.items and self.items[-1][1] <= value:
+            self.items.pop()
+        self.items.append((index, value))
+
+    def expire(self, first_index):
+        while self.items and self.items[0][0] < first_index:
+            self.items.popleft()
+
+    def max(self, default=0.0):
+        return self.items[0][1] if self.items else default
+
+
+class CircularMotionDetector:
+    def __init__(self, maxlen=50, min_points=20, min_total_degrees=270, min_consistency_degrees=200,
+                 refresh_every=500):
+        """
+        Incremental detector for a finger drawing a circle, with the same
+        decisions as measuring every step angle around the exact centroid of
+        the window.
+
+        Keeps a running centroid and running sums of the signed and absolute
+        angle swept between consecutive points around a reference center, so
+        each new point costs O(1). The exact centroid drifts away from the
+        reference as points come and go; the resulting error of the sums is
+        bounded by the drift and the closest point to the reference (see
+        `_error_bounds`). Only when that bound could change the decision are
+        the step angles recomputed around the exact centroid (one O(maxlen)
+        pass, which also makes it the new reference).
+
+        Args:
+            maxlen (int): Number of most recent points considered
+            min_points (int): Points needed before a circle can be reported
+            min_total_degrees (float): Minimum total angle swept
+            min_consistency_degrees (float): Minimum net angle in one direction
+            refresh_every (int): Points after which the running sums are
+                recomputed anyway, so rounding errors cannot build up
+        """
+        self.maxlen = maxlen
+        self.min_points = min_points
+        self.min_total_degrees = min_total_degrees
+        self.min_consistency_degrees = min_consistency_degrees
+        self.refresh_every = refresh_every
+
+        self.points = deque()   # (x, y, t)
+        self.deltas = deque()   # signed angle from the previous point, one per point after the first
+        self.nearest = _SlidingMax()        # -distance of each point to the reference center
+        self.largest_step = _SlidingMax()   # |delta| of each step
+        self.smallest_step = _SlidingMax()  # -|delta| of each step
+        self.clear()
+
+    def clear(self):
+        self.points.clear()
+        self.deltas.clear()
+        self.nearest.clear()
+        self.largest_step.clear()
+        self.smallest_step.clear()
+        self.sum_x = self.sum_y = 0.0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.positive = 0       # deltas > 0
+        self.ref_center = None
+        self.index = 0          # index of the next point
+        self.since_refresh = 0
+        self.recenters = 0
+
+    def __len__(self):
+        return len(self.points)
+
+    def center(self):
+        n = len(self.points)
+        return self.sum_x / n, self.sum_y / n
+
+    def _add_delta(self, delta, index):
+        self.deltas.append(delta)
+        self.delta_sum += delta
+        self.abs_delta_sum += abs(delta)
+        self.positive += delta > 0
+        self.largest_step.push(index, abs(delta))
+        self.smallest_step.push(index, -abs(delta))
+
+    def _recenter(self):
+        """Recompute every step angle around the exact centroid and make it the reference"""
+        points = np.array([(x, y) for x, y, _ in self.points])
+        center = np.mean(points, axis=0)
+        self.recenters += 1
+        self.since_refresh = 0
+
+        self.sum_x, self.sum_y = float(points[:, 0].sum()), float(points[:, 1].sum())
+        self.deltas.clear()
+        self.nearest.clear()
+        self.largest_step.clear()
+        self.smallest_step.clear()
+        self.delta_sum = self.abs_delta_sum = 0.0
+        self.positive = 0
+        # Plain floats are much faster to loop over than numpy rows, with the same results
+        center = self.ref_center = (float(center[0]), float(center[1]))
+        first = self.index - len(points)
+        previous = None
+        for i, point in enumerate(points.tolist()):
+            self.nearest.push(first + i, -math.hypot(point[0] - center[0], point[1] - center[1]))
+            if previous is not None:
+                self._add_delta(_step_angle(previous, point, center), first + i)
+            previous = point
+
+    def add(self, x, y, t=None):
+        """
+        Add a point and report whether the recent points form a circle.
+
+        Returns:
+            bool: True if a circular motion is detected
+        """
+        if len(self.points) == self.maxlen:
+            ox, oy, _ = self.points.popleft()
+            self.sum_x -= ox
+            self.sum_y -= oy
+            if self.deltas:
+                d = self.deltas.popleft()
+                self.delta_sum -= d
+                self.abs_delta_sum -= abs(d)
+                self.positive -= d > 0
+            first = self.index - len(self.points)
+            self.nearest.expire(first)
+            self.largest_step.expire(first + 1)
+            self.smallest_step.expire(first + 1)
+
+        self.points.append((x, y, t))
+        self.sum_x += x
+        self.sum_y += y
+
+        if self.ref_center is None:
+            self.ref_center = (x, y)
+        rx, ry = self.ref_center
+        self.nearest.push(self.index, -math.hypot(x - rx, y - ry))
+        if len(self.points) > 1:
+            self._add_delta(_step_angle(self.points[-2], self.points[-1], self.ref_center), self.index)
+        self.index += 1
+
+        self.since_refresh += 1
+        if self.since_refresh >= self.refresh_every:
+            self._recenter()
+
+        return self.is_circular()
+
+    def _error_bounds(self):
+        """
+        Upper bounds in radians on how far the window's net and total angle
+        around the reference center can be from those around the exact
+        centroid, or None when they can't be bounded (a point too close to
+        either center, or a step close to half a turn, which may wrap the
+        other way).
+        """
+        cx, cy = self.center()
+        rx, ry = self.ref_center
+        drift = math.hypot(cx - rx, cy - ry)
+        nearest = -self.nearest.max()
+        if drift >= nearest:
+            return None
+        # Each point's direction changes by at most asin(drift / distance), each step by twice that
+        step_error = 2 * math.asin(drift / nearest)
+        if self.largest_step.max() + step_error >= math.pi:
+            return None
+        # The step errors telescope in the net angle: only the first and last directions count
+        net_error = step_error + 1e-9
+        if -self.smallest_step.max() > step_error and self.positive in (0, len(self.deltas)):
+            # Every step keeps its sign, so the total angle is just the net angle
+            return net_error, net_error
+        return net_error, step_error * max(len(self.deltas) - 1, 0) + 1e-9
+
+    def _window_sums(self):
+        # The step into the oldest point's successor is not counted
+        if not self.deltas:
+            return 0.0, 0.0
+        first = self.deltas[0]
+        return self.delta_sum - first, self.abs_delta_sum - abs(first)
+
+    @staticmethod
+    def _compare(value, threshold, error):
+        """True/False if value > threshold holds for sure within error, None if it can't be told"""
+        if value - error > threshold:
+            return True
+        if value + error <= threshold:
+            return False
+        return None
+
+    def is_circular(self):
+        if len(self.points) < self.min_points:
+            return False
+        bounds = self._error_bounds()
+        if bounds is not None:
+            net, total = self._window_sums()
+            net_error, total_error = bounds
+            swept = self._compare(math.degrees(total), self.min_total_degrees, math.degrees(total_error))
+            if swept is None and math.degrees(abs(net) - net_error) > self.min_total_degrees:
+                # The total angle is never less than the net angle
+                swept = True
+            consistent = self._compare(math.degrees(abs(net)), self.min_consistency_degrees,
+                                       math.degrees(net_error))
+            if swept is False or consistent is False:
+                return False
+            if swept and consistent:
+                return True
+        # Too close to call from the running sums: measure around the exact centroid,
+        # summing in the same order as detect_circular_motion
+        self._recenter()
+        net = total = 0
+        for delta in itertools.islice(self.deltas, 1, None):
+            net += delta
+            total += abs(delta)
+        return (total * 180 / math.pi > self.min_total_degrees
+                and abs(net) * 180 / math.pi > self.min_consistency_degrees)
+
+    def direction(self):
+        """+1 if the points sweep clockwise on screen (y pointing down), -1 if counterclockwise, 0 if unknown"""
+        net, _ = self._window_sums()
+        return (net > 0) - (net < 0)
+
+    def angular_speed(self):
+        """Net rotation in degrees per second over the window, if points were timestamped"""
+        if len(self.points) < 2 or self.points[0][2] is None or self.points[-1][2] is None:
+            return 0.0
+        span = self.points[-1][2] - self.points[0][2]
+        net, _ = self._window_sums()
+        return math.degrees(net) / span if span > 0 else 0.0
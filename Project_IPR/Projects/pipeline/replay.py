@@ -0,0 +1,190 @@
+import os
+import time
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, arrays_to_results, results_to_arrays
+
+
+class LandmarkRecorder:
+    def __init__(self, max_hands=2, chunk_size=1024):
+        """
+        Collect `Hands.process` results into fixed-shape arrays.
+
+        The recording has `timestamps` (frames,), `points`
+        (frames, max_hands, 21, 3) normalized landmarks with NaN where no hand
+        was seen, `labels` (frames, max_hands) handedness strings and `scores`
+        (frames, max_hands).
+        """
+        self.max_hands = max_hands
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.timestamps = np.zeros(0, np.float64)
+        self.points = np.zeros((0, max_hands, NUM_LANDMARKS, 3), np.float32)
+        self.labels = np.zeros((0, max_hands), "<U8")
+        self.scores = np.zeros((0, max_hands), np.float32)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        n = len(self.timestamps) + self.chunk_size
+        self.timestamps = np.resize(self.timestamps, n)
+        self.points = np.resize(self.points, (n, self.max_hands, NUM_LANDMARKS, 3))
+        self.labels = np.resize(self.labels, (n, self.max_hands))
+        self.scores = np.resize(self.scores, (n, self.max_hands))
+
+    def record(self, results, timestamp=None):
+        """Append one frame of results"""
+        if self.count == len(self.timestamps):
+            self._grow()
+
+        points, labels, scores = results_to_arrays(results)
+        n = min(len(points), self.max_hands)
+        i = self.count
+        self.timestamps[i] = time.monotonic() if timestamp is None else timestamp
+        self.points[i] = np.nan
+        self.points[i, :n] = points[:n]
+        self.labels[i] = ""
+        self.labels[i, :n] = labels[:n]
+        self.scores[i] = 0
+        self.scores[i, :n] = scores[:n]
+        self.count += 1
+
+    def arrays(self):
+        n = self.count
+        return {
+            "timestamps": self.timestamps[:n] - (self.timestamps[0] if n else 0),
+            "points": self.points[:n],
+            "labels": self.labels[:n],
+            "scores": self.scores[:n],
+        }
+
+    def save(self, path):
+        """
+        Save to `path`. A ".npz" path writes one archive; any other path is
+        used as a directory of ".npy" files that `load_recording` can memory-map.
+        """
+        arrays = self.arrays()
+        if path.endswith(".npz"):
+            np.savez(path, **arrays)
+            return
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), array)
+
+
+def load_recording(path, mmap=False):
+    """Load a recording saved by `LandmarkRecorder.save` as a dict of arrays"""
+    if os.path.isdir(path):
+        mode = "r" if mmap else None
+        return {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode)
+                for name in ("timestamps", "points", "labels", "scores")}
+
+    data = np.load(path, mmap_mode="r" if mmap else None)
+    if isinstance(data, np.ndarray):
+        # Bare (frames, hands, 21, 3) array saved as ".npy"
+        return _bare_recording(data)
+
+    with data:
+        if "timestamps" not in data:
+            return _bare_recording(data["points"])
+        return {name: data[name] for name in data.files}
+
+
+def _bare_recording(points):
+    """Recording of bare (frames, hands, 21, 3) points at 30 fps, without labels"""
+    return {"timestamps": np.arange(len(points)) / 30.0, "points": points,
+            "labels": np.full(points.shape[:2], "", "<U8"),
+            "scores": np.ones(points.shape[:2], np.float32)}
+
+
+class RecordingHands:
+    """Pass `process` through to a `Hands`-like object and record every result."""
+
+    def __init__(self, hands, path, max_hands=2):
+        self.hands = hands
+        self.path = path
+        self.recorder = LandmarkRecorder(max_hands)
+
+    def process(self, rgb_frame):
+        results = self.hands.process(rgb_frame)
+        self.recorder.record(results)
+        return results
+
+    def save(self):
+        if len(self.recorder):
+            self.recorder.save(self.path)
+
+
+class ReplayHands:
+    def __init__(self, recording, realtime=False, loop=False):
+        """
+        Deterministic stand-in for `Hands.process` that serves recorded landmarks.
+
+        Args:
+            recording (str | dict): Path accepted by `load_recording`, or its dict of arrays
+            realtime (bool): Pace frames by their recorded timestamps, skipping
+                ahead when the caller falls behind. Otherwise every call returns
+                the next frame as fast as possible.
+            loop (bool): Start over at the end instead of returning no hands
+        """
+        data = load_recording(recording) if isinstance(recording, str) else recording
+        self.timestamps = np.asarray(data["timestamps"], np.float64)
+        self.points = data["points"]
+        self.labels = data.get("labels")
+        self.scores = data.get("scores")
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        self.start_time = None
+
+    @classmethod
+    def from_arrays(cls, points, fps=30.0, **kwargs):
+        """Replay a bare (frames, hands, 21, 3) array (NaN = no hand)"""
+        return cls({"timestamps": np.arange(len(points)) / fps, "points": points}, **kwargs)
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def finished(self):
+        return not self.loop and self.index >= len(self.points)
+
+    def _next_index(self):
+        n = len(self.points)
+        if not self.realtime:
+            i = self.index
+            self.index += 1
+            return i % n if self.loop else i
+
+        now = time.monotonic()
+        if self.start_time is None:
+            self.start_time = now - self.timestamps[0]
+        duration = self.timestamps[-1] + (self.timestamps[-1] / max(1, n - 1))
+        elapsed = now - self.start_time
+        if self.loop and duration > 0:
+            elapsed %= duration
+
+        # Latest frame already due; wait for the next one if we are ahead
+        i = max(int(np.searchsorted(self.timestamps, elapsed, side="right")) - 1, 0)
+        if i < self.index and not self.loop:
+            i = self.index
+            delay = self.timestamps[i] - elapsed if i < n else 0
+            if delay > 0:
+                time.sleep(delay)
+        self.index = i + 1
+        return i
+
+    def process(self, rgb_frame=None):
+        i = self._next_index()
+        if i >= len(self.points):
+            return arrays_to_results([])
+
+        hands = np.asarray(self.points[i])
+        present = ~np.isnan(hands).any(axis=(1, 2))
+        labels = self.labels[i][present].tolist() if self.labels is not None else None
+        scores = self.scores[i][present].tolist() if self.scores is not None else None
+        if labels is not None:
+            labels = [label or str(k) for k, label in enumerate(labels)]
+        return arrays_to_results(hands[present], labels, scores)
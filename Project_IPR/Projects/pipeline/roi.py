@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+
+
+class HandRoiProcessor:
+    def __init__(self, hands, max_size=640, roi=False, margin=0.6, min_roi=0.35, roi_hands=None):
+        """
+        Wrap a MediaPipe `Hands` object so inference resolution is decoupled
+        from capture / display resolution.
+
+        Frames are downscaled so their longer side is at most `max_size`
+        before inference. With `roi=True` only a crop around the hands found in
+        the previous frame is inferred (falling back to the full frame when
+        that finds nothing). Landmarks are always mapped back so they are
+        normalized to the full input frame, like plain `hands.process`.
+
+        Crops go to their own `roi_hands`: MediaPipe's tracking assumes
+        consecutive images of the same view, which crops that move with the
+        hand (and alternate with full frames) are not.
+
+        Args:
+            hands: MediaPipe `Hands` instance (or anything with `process`)
+            max_size (int): Longest side in pixels of the inferred image
+            roi (bool): Crop around the previous frame's hand bounding box
+            margin (float): Padding around the box as a fraction of its size
+            min_roi (float): Minimum crop side as a fraction of the frame
+            roi_hands: `Hands` instance for the crops, e.g. with
+                `static_image_mode=True`; required with `roi=True`
+        """
+        if roi and roi_hands is None:
+            raise ValueError("roi=True needs a separate roi_hands instance for the crops")
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.max_size = max_size
+        self.roi = roi
+        self.margin = margin
+        self.min_roi = min_roi
+        self.last_roi = None   # (x0, y0, x1, y1) normalized, None = full frame
+
+    def process(self, rgb_frame):
+        if self.roi and self.last_roi is not None:
+            results = self._process_region(rgb_frame, self.last_roi)
+            if results.multi_hand_landmarks:
+                self._update_roi(results)
+                return results
+
+        results = self._process_region(rgb_frame, None)
+        self._update_roi(results)
+        return results
+
+    def _process_region(self, rgb_frame, region):
+        hands = self.hands if region is None else self.roi_hands
+        h, w = rgb_frame.shape[:2]
+        if region is None:
+            x0, y0, x1, y1 = 0, 0, w, h
+        else:
+            x0, y0 = int(region[0] * w), int(region[1] * h)
+            x1, y1 = int(region[2] * w), int(region[3] * h)
+
+        crop = rgb_frame[y0:y1, x0:x1]
+        crop_h, crop_w = crop.shape[:2]
+        scale = self.max_size / max(crop_h, crop_w)
+        if scale < 1:
+            crop = cv2.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        elif region is not None:
+            crop = np.ascontiguousarray(crop)  # MediaPipe needs a contiguous image
+
+        results = hands.process(crop)
+        if region is not None and results.multi_hand_landmarks:
+            self._to_frame_coords(results, x0 / w, y0 / h, crop_w / w, crop_h / h)
+        return results
+
+    def _to_frame_coords(self, results, x0, y0, sx, sy):
+        """Map landmarks normalized to the crop back to the full frame"""
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = x0 + lm.x * sx
+                lm.y = y0 + lm.y * sy
+                lm.z = lm.z * sx  # z shares the x scale in MediaPipe
+
+    def _update_roi(self, results):
+        if not self.roi or not results.multi_hand_landmarks:
+            self.last_roi = None
+            return
+
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        half_w = max((max(xs) - min(xs)) * (1 + self.margin), self.min_roi) / 2
+        half_h = max((max(ys) - min(ys)) * (1 + self.margin), self.min_roi) / 2
+
+        x0, x1 = max(0.0, cx - half_w), min(1.0, cx + half_w)
+        y0, y1 = max(0.0, cy - half_h), min(1.0, cy + half_h)
+        self.last_roi = (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
@@ -0,0 +1,147 @@
+import csv
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+
+class _RingBuffer:
+    def __init__(self, size):
+        self.values = np.zeros(size, np.float64)
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def window(self):
+        return self.values[:self.count]
+
+
+class FrameTimer:
+    def __init__(self, window=300):
+        """
+        Lightweight per-frame stage timing.
+
+        Wrap each stage of a frame in `with timer.stage(name):` between
+        `begin_frame()` and `end_frame()`. The last `window` samples of every
+        stage (and of the whole frame, as "total") are kept in ring buffers
+        for rolling percentiles, and can be streamed to CSV.
+
+        Args:
+            window (int): Number of frames kept for the rolling statistics
+        """
+        self.window = window
+        self.buffers = {}
+        self.current = {}
+        self.frame_index = 0
+        self.frame_start = None
+        self.last_frame_end = None
+        self.csv_file = None
+        self.csv_writer = None
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """Add time to a stage of the current frame (repeated stages accumulate)"""
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        end = time.perf_counter()
+        self.current["total"] = end - self.frame_start
+        if self.last_frame_end is not None:
+            self.current["interval"] = end - self.last_frame_end
+        self.last_frame_end = end
+
+        for name, seconds in self.current.items():
+            buffer = self.buffers.get(name)
+            if buffer is None:
+                buffer = self.buffers[name] = _RingBuffer(self.window)
+            buffer.push(seconds)
+
+        if self.csv_writer is not None:
+            now = time.time()
+            for name, seconds in self.current.items():
+                self.csv_writer.writerow([self.frame_index, f"{now:.6f}", name, f"{seconds * 1000:.4f}"])
+
+        self.frame_index += 1
+        self.frame_start = None
+
+    def processing_time(self, waits=("capture", "display")):
+        """
+        Seconds of the last finished frame spent processing: the total minus
+        the `waits` stages, which may block on the camera or the window.
+        """
+        return self.current.get("total", 0.0) - sum(self.current.get(name, 0.0) for name in waits)
+
+    def stats(self, name):
+        """Get rolling mean / p50 / p99 of a stage in milliseconds"""
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.count == 0:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+        values = buffer.window() * 1000
+        p50, p99 = np.percentile(values, (50, 99))
+        return {"mean_ms": float(values.mean()), "p50_ms": float(p50), "p99_ms": float(p99)}
+
+    def summary(self):
+        return {name: self.stats(name) for name in self.buffers}
+
+    def fps(self):
+        interval = self.stats("interval")["mean_ms"]
+        return 1000 / interval if interval else 0.0
+
+    def hud_lines(self):
+        """Human readable lines: fps first, then every stage as mean / p99"""
+        lines = [f"{self.fps():5.1f} fps"]
+        for name in self.buffers:
+            if name == "interval":
+                continue
+            s = self.stats(name)
+            lines.append(f"{name:<14}{s['mean_ms']:6.1f} /{s['p99_ms']:6.1f} ms")
+        return lines
+
+    def status_text(self):
+        """One-line summary for a status bar"""
+        total = self.stats("total")
+        return f"{self.fps():.1f} fps | frame {total['mean_ms']:.1f} ms (p99 {total['p99_ms']:.1f})"
+
+    def draw_hud(self, frame, origin=(10, 20), line_height=16):
+        """Draw the HUD onto a BGR frame in place"""
+        x, y = origin
+        for line in self.hud_lines():
+            cv2.putText(frame, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 0, 0), 3, cv2.LINE_AA)
+            cv2.putText(frame, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1, cv2.LINE_AA)
+            y += line_height
+        return frame
+
+    def start_csv(self, path):
+        """Stream every frame's stage timings to `path` as frame,time,stage,ms rows"""
+        self.stop_csv()
+        self.csv_file = open(path, "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(["frame", "time", "stage", "ms"])
+
+    def stop_csv(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.csv_file = None
+        self.csv_writer = None
+
+    @property
+    def recording_csv(self):
+        return self.csv_writer is not None
@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QOpenGLWidget, QWidget
+
+
+class _FrameView:
+    """
+    Shared state of the video widgets: the QImage wraps the frame's own
+    memory (no copy), is only rebuilt when the frame buffer changes, and the
+    aspect-correct target rectangle is only recomputed on resize.
+    """
+
+    def _init_view(self):
+        self.frame = None
+        self.image = None
+        self.target_rect = QRect()
+        self.frame_time = None
+        self.timings = None   # (paint seconds, latency seconds) of the last paint
+        self.setMinimumSize(640, 480)
+
+    def set_frame(self, frame):
+        """
+        Show a BGR frame. The widget keeps a reference to `frame` and paints
+        straight from its memory, so the caller may keep reusing the buffer
+        for later frames.
+        """
+        if not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame)
+        if (self.frame is None or self.frame.shape != frame.shape
+                or self.frame.ctypes.data != frame.ctypes.data):
+            h, w, ch = frame.shape
+            self.image = QImage(frame.data, w, h, ch * w, QImage.Format_BGR888)
+            self.frame = frame
+            self._update_target_rect()
+        self.frame_time = time.perf_counter()
+        self.update()
+
+    def clear(self):
+        self.frame = None
+        self.image = None
+        self.frame_time = None
+        self.update()
+
+    def take_timings(self):
+        """Get (paint seconds, set_frame-to-painted latency) once per paint, else None"""
+        timings, self.timings = self.timings, None
+        return timings
+
+    def _update_target_rect(self):
+        if self.frame is None:
+            return
+        h, w = self.frame.shape[:2]
+        scale = min(self.width() / w, self.height() / h)
+        tw, th = int(w * scale), int(h * scale)
+        self.target_rect = QRect((self.width() - tw) // 2, (self.height() - th) // 2, tw, th)
+
+    def _paint(self):
+        start = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0))
+        if self.image is not None:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(self.target_rect, self.image)
+        painter.end()
+
+        if self.frame_time is not None:
+            end = time.perf_counter()
+            self.timings = (end - start, end - self.frame_time)
+            self.frame_time = None
+
+
+class VideoWidget(_FrameView, QWidget):
+    """Raster video view painted directly in `paintEvent`."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._init_view()
+
+    def resizeEvent(self, event):
+        self._update_target_rect()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        self._paint()
+
+
+class GLVideoWidget(_FrameView, QOpenGLWidget):
+    """
+    Video view that uploads each frame as a texture through QPainter's OpenGL
+    paint engine. Set `Qt.AA_UseSoftwareOpenGL` before creating the
+    QApplication to run it on a software renderer.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_view()
+
+    def resizeGL(self, w, h):
+        self._update_target_rect()
+
+    def paintGL(self):
+        self._paint()
+
+
+def create_video_widget(opengl=False, parent=None):
+    return GLVideoWidget(parent) if opengl else VideoWidget(parent)
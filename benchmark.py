@@ -0,0 +1,231 @@
+"""
+Headless end-to-end benchmark: runs the gesture-effect pipeline on a recorded
+video (or synthetic frames) with recorded or synthetic landmarks, without a
+camera or window, and reports frame timings as JSON.
+
+    python benchmark.py --frames 300 --output bench.json
+    python benchmark.py --video clip.mp4 --landmarks clip_landmarks.npz --effects snow Fire
+"""
+import argparse
+import json
+import math
+import time
+
+import cv2
+import numpy as np
+
+from Project_IPR.Projects.pipeline.clock import FrameClock
+from Project_IPR.Projects.pipeline.gestures import GestureEngine
+from Project_IPR.Projects.pipeline.preprocess import FramePreprocessor
+from Project_IPR.Projects.pipeline.replay import ReplayHands, load_recording
+
+STAGES = ["capture", "preprocess", "inference", "gestures", "effect"]
+# Effects benchmarked by default; "heart" is left out because its sticker image is not shipped, so it draws nothing
+DEFAULT_EFFECTS = ["explosion", "snow", "sparkle", "moving_light", "rainbow",
+                   "Fireworks", "Sparkles", "Fire", "Rainbow Trail"]
+
+# Open hand, normalized offsets from the palm center (MediaPipe landmark order)
+OPEN_HAND = np.array([
+    [0.00, 0.14], [-0.05, 0.11], [-0.08, 0.07], [-0.10, 0.03], [-0.12, 0.00],   # wrist, thumb
+    [-0.04, 0.00], [-0.05, -0.05], [-0.05, -0.09], [-0.05, -0.12],              # index
+    [0.00, -0.01], [0.00, -0.07], [0.00, -0.11], [0.00, -0.14],                 # middle
+    [0.04, 0.00], [0.04, -0.05], [0.04, -0.09], [0.04, -0.12],                  # ring
+    [0.07, 0.02], [0.08, -0.02], [0.08, -0.05], [0.08, -0.08],                  # pinky
+], dtype=np.float32)
+
+
+def synthetic_landmarks(num_frames, num_hands=1):
+    """Open hands circling the frame: array of shape (frames, hands, 21, 3)"""
+    points = np.zeros((num_frames, num_hands, 21, 3), np.float32)
+    for i in range(num_frames):
+        for h in range(num_hands):
+            angle = i * 0.08 + h * math.pi
+            cx = 0.5 + 0.2 * math.cos(angle)
+            cy = 0.5 + 0.15 * math.sin(angle)
+            points[i, h, :, :2] = OPEN_HAND + (cx, cy)
+    return points
+
+
+def synthetic_labels(num_hands):
+    """One distinct handedness label per synthetic hand"""
+    return (["Right", "Left"] + [f"Hand{i}" for i in range(2, num_hands)])[:num_hands]
+
+
+class FrameSource:
+    def __init__(self, video=None, width=640, height=480):
+        self.cap = cv2.VideoCapture(video) if video else None
+        if self.cap is not None and not self.cap.isOpened():
+            raise RuntimeError(f"Could not open video: {video}")
+
+        # A textured frame so blending does real work
+        yy, xx = np.mgrid[:height, :width]
+        base = np.stack([xx * 255 // max(1, width - 1), yy * 255 // max(1, height - 1),
+                         (xx + yy) % 256], axis=-1).astype(np.uint8)
+        self.synthetic = base
+
+    def read(self):
+        if self.cap is None:
+            return self.synthetic.copy()
+        ret, frame = self.cap.read()
+        if not ret:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+def create_registries():
+    """Fresh effect registries of the OpenCV app and of the Qt app"""
+    import effect
+    from Project_IPR.Projects.effects.registry import create_default_registry
+    return [effect.create_effect_registry(), create_default_registry()]
+
+
+def effect_names():
+    """Every registered effect, the OpenCV app's first"""
+    return [name for registry in create_registries() for name in registry.names()]
+
+
+def make_effect(name, intensity=50):
+    """Create `name` from the OpenCV app's or the Qt app's effect registry, as the apps do"""
+    for registry in create_registries():
+        if name in registry:
+            active_effect = registry.select(name)
+            active_effect.set_intensity(intensity)
+            return registry, active_effect
+    raise ValueError(f"Unknown effect: {name}")
+
+
+# Last-trigger times of the gesture-triggered effects (see effect.py)
+TRIGGER_TIMES = ("last_time_hand_open_after_close", "last_time_index_finger_spin")
+
+
+def force_triggers(active_effect):
+    """Mark every gesture trigger as just fired, so effects run at their worst case"""
+    if hasattr(active_effect, "last_time_index_finger_spin"):
+        active_effect.last_time_index_finger_spin = math.inf
+    hand_states = getattr(active_effect, "hands", None)
+    for state in hand_states.values() if hasattr(hand_states, "values") else ():
+        for name in TRIGGER_TIMES:
+            if isinstance(state, dict) and name in state:
+                state[name] = math.inf
+
+
+def make_hands(args, recording):
+    if args.inference == "mediapipe":
+        import mediapipe as mp
+        return mp.solutions.hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    return ReplayHands(recording, loop=True)
+
+
+def summarize(samples):
+    samples = np.asarray(samples) * 1000
+    if len(samples) == 0:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+    return {
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+    }
+
+
+def run_effect(name, args, recording):
+    registry, active_effect = make_effect(name, args.intensity)
+    source = FrameSource(args.video, args.width, args.height)
+    hands = make_hands(args, recording)
+    engine = GestureEngine()
+    preprocessor = FramePreprocessor(flip=True)
+    clock = FrameClock()
+
+    frame_times = []
+    stage_times = {stage: [] for stage in STAGES}
+
+    for i in range(args.warmup + args.frames):
+        t0 = time.perf_counter()
+        frame = source.read()
+        t1 = time.perf_counter()
+        frame, rgb_frame = preprocessor.process(frame)
+        t2 = time.perf_counter()
+        results = hands.process(rgb_frame)
+        t3 = time.perf_counter()
+        h, w = frame.shape[:2]
+        detected = engine.update(results, w, h)
+        t4 = time.perf_counter()
+        # Gesture triggers are treated as always active to measure the worst case
+        force_triggers(active_effect)
+        # The effect clock runs at --fps whatever the measured speed, so every
+        # frame simulates the same fixed steps as the app would at that rate
+        clock.tick(i / args.fps)
+        active_effect.advance(clock, detected)
+        frame = active_effect.render(frame)
+        t5 = time.perf_counter()
+
+        if i >= args.warmup:
+            frame_times.append(t5 - t0)
+            for stage, dt in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+                stage_times[stage].append(dt)
+
+    source.release()
+    registry.release_all()
+    total = sum(frame_times)
+    report = {
+        "frames": len(frame_times),
+        "fps": round(len(frame_times) / total, 2) if total else 0.0,
+        **summarize(frame_times),
+        "stages": {stage: summarize(times) for stage, times in stage_times.items()},
+    }
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless gesture-effect pipeline benchmark")
+    parser.add_argument("--effects", nargs="+", default=DEFAULT_EFFECTS,
+                        choices=effect_names(), help="Effects to benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="Measured frames per effect")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured frames per effect")
+    parser.add_argument("--width", type=int, default=640, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=480, help="Synthetic frame height")
+    parser.add_argument("--video", help="Video file to use instead of synthetic frames")
+    parser.add_argument("--landmarks", help="Landmark recording (.npz or directory) instead of synthetic landmarks")
+    parser.add_argument("--hands", type=int, default=1, help="Number of synthetic hands")
+    parser.add_argument("--inference", choices=["replay", "mediapipe"], default="replay",
+                        help="Replay landmarks or run MediaPipe on the frames")
+    parser.add_argument("--intensity", type=int, default=50, help="Effect intensity for the Qt effects")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate simulated by the effect clock")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.landmarks:
+        recording = load_recording(args.landmarks)
+    else:
+        points = synthetic_landmarks(args.warmup + args.frames, args.hands)
+        recording = {"timestamps": np.arange(len(points)) / 30.0, "points": points,
+                     "labels": np.array([synthetic_labels(args.hands)] * len(points))}
+
+    report = {
+        "config": {
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "source": args.video or f"synthetic {args.width}x{args.height}",
+            "landmarks": args.landmarks or f"synthetic, {args.hands} hand(s)",
+            "inference": args.inference,
+        },
+        "effects": {name: run_effect(name, args, recording) for name in args.effects},
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,249 +1,289 @@
 import cv2
 import numpy as np
-import time
 import random
 import math
 import os
+from collections import deque
+from Project_IPR.Projects.effects.assets import get_bundle
+from Project_IPR.Projects.effects.compositing import (blend_planes, blend_premultiplied, blend_premultiplied_centered,
+                                                     blend_straight, split_premultiplied)
+from Project_IPR.Projects.effects.particles import ParticleSystem
+from Project_IPR.Projects.effects.registry import Effect, EffectRegistry, HandStates
+from Project_IPR.Projects.effects.sprite_cache import SpriteCache
+from Project_IPR.Projects.pipeline.motion import CircularMotionDetector
+
+# Icons come premultiplied from the asset bundle and are only loaded on first use
+assets = get_bundle()
+
+def asset_frame(group, index=0):
+    frames = assets.frames(group)
+    return frames[index] if index < len(frames) else None
+
+# Pre-scaled / pre-rotated sprites shared by every icon based effect
+sprite_cache = SpriteCache()
+sprite_cache.register_lazy("explosion", lambda: asset_frame("explosion"), premultiplied=True)
+
+# Quality scale factors (1.0 = full quality), lowered by the adaptive quality governor
+quality = {"particles": 1.0, "trail": 1.0, "sprites": 1.0}
+
+def set_quality(settings):
+    """Apply quality scale factors, e.g. a level from pipeline.governor.QUALITY_LEVELS."""
+    if settings.get("sprites", quality["sprites"]) != quality["sprites"]:
+        sprite_cache.set_resolution(settings["sprites"])
+    quality.update({name: settings[name] for name in quality if name in settings})
+
+def scaled_count(count):
+    """Number of particles to emit at the current quality."""
+    return max(1, int(round(count * quality["particles"])))
+
+# Global particle pool (hard cap on live explosion particles)
+explosion_particles = ParticleSystem(capacity=1024)
+
+def draw_explosion_particles(frame, now):
+    """Age, cull and draw every live explosion particle against one timestamp."""
+    explosion_particles.update(now)
+    n = len(explosion_particles)
+    if n == 0:
+        return
 
-def current_milli_time():
-    return round(time.time() * 1000)
-
-# Load the explosion icon once globally (with alpha channel)
-explosion_icon = cv2.imread("explosion_icon.png", cv2.IMREAD_UNCHANGED)
-
-# Global particle list
-explosion_particles = []
-
-class ExplosionParticle:
-    def __init__(self, x, y, is_more):
-        size = 90 if is_more else 30
-        self.x = x + np.random.randint(-size, size)
-        self.y = y + np.random.randint(-size, size)
-        self.size = np.random.uniform(0.3, 0.6)
-        self.birth_time = current_milli_time()
-        self.lifetime = np.random.randint(500, 1500)  # milliseconds
-
-    def age(self):
-        return current_milli_time() - self.birth_time
-
-    def is_alive(self):
-        return self.age() < self.lifetime
-
-    def draw(self, frame):
-        age_ratio = self.age() / self.lifetime
-        scale = 1 + age_ratio * 1.5  # increase size as it ages
-        alpha = max(1.0 - age_ratio, 0)
-
-        resized_icon = cv2.resize(
-            explosion_icon, 
-            (0, 0), 
-            fx=self.size * scale, 
-            fy=self.size * scale, 
-            interpolation=cv2.INTER_AREA
-        )
-
-        icon_h, icon_w = resized_icon.shape[:2]
-        x1 = int(self.x - icon_w // 2)
-        y1 = int(self.y - icon_h // 2)
-
-        # Ensure bounds
-        if x1 < 0 or y1 < 0 or x1 + icon_w > frame.shape[1] or y1 + icon_h > frame.shape[0]:
-            return
-
-        # Separate alpha channel and color
-        icon_rgb = resized_icon[:, :, :3]
-        icon_alpha = resized_icon[:, :, 3] / 255.0 * alpha
-
-        for c in range(3):
-            frame[y1:y1+icon_h, x1:x1+icon_w, c] = (
-                icon_alpha * icon_rgb[:, :, c] +
-                (1 - icon_alpha) * frame[y1:y1+icon_h, x1:x1+icon_w, c]
-            ).astype(np.uint8)
-
-def draw_explosion_effect(frame, x, y, last_time_hand_open_after_close):
-    def more_explosion():
-        second_since_last = (current_milli_time() - last_time_hand_open_after_close) / 1000
-        return second_since_last < 1.5
-
-    global explosion_particles
-    is_more = more_explosion()
-    num_new_particles = 15 if is_more else 3
+    age_ratio = explosion_particles.age_ratio(now)
+    scales = explosion_particles.size[:n] * (1 + age_ratio * 1.5)  # increase size as it ages
+    alphas = 1.0 - age_ratio
 
-    # Add new particles
-    for _ in range(num_new_particles):
-        explosion_particles.append(ExplosionParticle(x, y, is_more))
+    for px, py, scale, alpha in zip(explosion_particles.x[:n].tolist(), explosion_particles.y[:n].tolist(),
+                                    scales.tolist(), alphas.tolist()):
+        sprite = sprite_cache.get("explosion", scale)
+        if sprite is not None:
+            blend_premultiplied_centered(frame, sprite, px, py, alpha)
 
-    # Draw and keep alive particles
-    alive_particles = []
-    for particle in explosion_particles:
-        if particle.is_alive():
-            particle.draw(frame)
-            alive_particles.append(particle)
+def emit_explosion(x, y, now, last_time_hand_open_after_close):
+    is_more = (now - last_time_hand_open_after_close) / 1000 < 1.5
+    num_new_particles = scaled_count(15 if is_more else 3)
+    spread = 90 if is_more else 30
 
-    explosion_particles = alive_particles  # Update list
+    # Add new particles
+    explosion_particles.emit(
+        x + np.random.randint(-spread, spread, num_new_particles),
+        y + np.random.randint(-spread, spread, num_new_particles),
+        now,
+        lifetime=np.random.randint(500, 1500, num_new_particles),  # milliseconds
+        size=np.random.uniform(0.3, 0.6, num_new_particles),
+    )
 
-# Load snowflake icon with alpha channel
-snowflake_icon = cv2.imread("snowflake_icon.png", cv2.IMREAD_UNCHANGED)
+sprite_cache.register_lazy("snowflake", lambda: asset_frame("snowflake"), premultiplied=True)
 
 class RealisticSnowflake:
+    # Speeds are per second (pixels, degrees)
     def __init__(self, width, height):
         self.x = random.randint(0, width)
         self.y = random.randint(0, height)
         self.size_scale = random.uniform(0.3, 0.8)
-        self.speed = random.uniform(1, 2)
-        self.wind = random.uniform(-0.5, 0.5)
+        self.speed = random.uniform(30, 60)
+        self.wind = random.uniform(-15, 15)
         self.angle = random.uniform(0, 360)
-        self.spin_speed = random.uniform(-1, 1)
+        self.spin_speed = random.uniform(-30, 30)
+        # State before the last step, to interpolate between steps
+        self.prev = (self.x, self.y, self.angle)
 
-    def update(self, width, height):
-        self.y += self.speed
-        self.x += self.wind
-        self.angle = (self.angle + self.spin_speed) % 360
+    def step(self, dt, width, height):
+        self.angle %= 360
+        self.prev = (self.x, self.y, self.angle)
+        self.y += self.speed * dt
+        self.x += self.wind * dt
+        self.angle += self.spin_speed * dt
 
         # Reset if below screen
         if self.y > height:
             self.y = random.uniform(-20, -10)
             self.x = random.randint(0, width)
-            self.speed = random.uniform(1, 2)
-            self.wind = random.uniform(-0.5, 0.5)
+            self.speed = random.uniform(30, 60)
+            self.wind = random.uniform(-15, 15)
             self.angle = random.uniform(0, 360)
+            self.prev = (self.x, self.y, self.angle)
 
-    def draw(self, frame):
-        # Resize and rotate the snowflake
-        scaled_icon = cv2.resize(
-            snowflake_icon, 
-            (0, 0), 
-            fx=self.size_scale, 
-            fy=self.size_scale, 
-            interpolation=cv2.INTER_AREA
-        )
-
-        (h, w) = scaled_icon.shape[:2]
-        center = (w // 2, h // 2)
-
-        # Rotate with transparency
-        M = cv2.getRotationMatrix2D(center, self.angle, 1.0)
-        rotated = cv2.warpAffine(scaled_icon, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0,0,0,0))
+    def draw(self, frame, alpha=1.0):
+        # Position between the last two steps
+        px, py, pangle = self.prev
+        x = px + (self.x - px) * alpha
+        y = py + (self.y - py) * alpha
+        angle = (pangle + (self.angle - pangle) * alpha) % 360
 
-        x1 = int(self.x - w // 2)
-        y1 = int(self.y - h // 2)
+        # Resized and rotated snowflake from the sprite cache
+        sprite = sprite_cache.get("snowflake", self.size_scale, angle)
+        if sprite is not None:
+            blend_premultiplied_centered(frame, sprite, x, y)
 
-        if x1 < 0 or y1 < 0 or x1 + w > frame.shape[1] or y1 + h > frame.shape[0]:
-            return
+class SnowLayer:
+    """A tileable pre-rendered texture of snowflakes at one depth, scrolled and wrapped each frame."""
 
-        icon_rgb = rotated[:, :, :3]
-        icon_alpha = rotated[:, :, 3] / 255.0
-
-        for c in range(3):
-            frame[y1:y1+h, x1:x1+w, c] = (
-                icon_alpha * icon_rgb[:, :, c] +
-                (1 - icon_alpha) * frame[y1:y1+h, x1:x1+w, c]
-            ).astype(np.uint8)
+    def __init__(self, width, height, num_snowflakes, scale_range, speed, wind):
+        # speed, wind: pixels per second
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.wind = wind
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.prev_offset = (0.0, 0.0)
+        texture = np.zeros((height, width, 4), np.uint8)  # premultiplied BGRA
+
+        for _ in range(num_snowflakes):
+            sprite = sprite_cache.get("snowflake", random.uniform(*scale_range), random.uniform(0, 360))
+            if sprite is None:
+                break
+            fx = random.randint(0, width)
+            fy = random.randint(0, height)
+            # Stamp wrapped copies too so the texture tiles seamlessly
+            for dx in (-width, 0, width):
+                for dy in (-height, 0, height):
+                    blend_premultiplied_centered(texture, sprite, fx + dx, fy + dy)
+
+        self.color, self.inv_alpha = split_premultiplied(texture)
+
+    def step(self, dt):
+        # Wrap before moving, so interpolating toward the new offset never jumps back
+        self.offset_x %= self.width
+        self.offset_y %= self.height
+        self.prev_offset = (self.offset_x, self.offset_y)
+        self.offset_y += self.speed * dt
+        self.offset_x += self.wind * dt
+
+    def draw(self, frame, alpha=1.0):
+        w, h = self.width, self.height
+        # Offset between the last two steps, wrapped into the texture
+        px, py = self.prev_offset
+        ox = int(px + (self.offset_x - px) * alpha) % w
+        oy = int(py + (self.offset_y - py) * alpha) % h
+        # Texture pixel (r, c) lands on frame pixel ((r + oy) % h, (c + ox) % w)
+        for rows, dst_y in ((slice(h - oy, h), 0), (slice(0, h - oy), oy)):
+            for cols, dst_x in ((slice(w - ox, w), 0), (slice(0, w - ox), ox)):
+                if rows.start < rows.stop and cols.start < cols.stop:
+                    blend_planes(frame, self.color[rows, cols], self.inv_alpha[rows, cols], dst_x, dst_y)
+
+# (fraction of flakes, scale range, fall speed in pixels per second) per depth layer, far to near
+SNOW_LAYER_DEPTHS = [
+    (0.5, (0.2, 0.35), 21),
+    (0.3, (0.35, 0.55), 39),
+    (0.2, (0.55, 0.8), 60),
+]
 
 class RealisticSnowEffect:
-    def __init__(self, width, height, num_snowflakes=100):
-        self.snowflakes = [RealisticSnowflake(width, height) for _ in range(num_snowflakes)]
+    def __init__(self, width, height, num_snowflakes=100, mode="sprites"):
+        """
+        mode="sprites" moves and draws every flake individually (cost grows with
+        num_snowflakes); mode="layers" pre-renders the flakes into a few parallax
+        depth layers that are only scrolled per frame (roughly constant cost).
+        """
         self.width = width
         self.height = height
+        self.num_snowflakes = num_snowflakes
+        self.mode = mode
+        self.snowflakes = []
+        self.layers = []
+
+        if mode == "layers":
+            self.layers = [
+                SnowLayer(width, height, int(num_snowflakes * fraction), scale_range, speed, random.uniform(-15, 15))
+                for fraction, scale_range, speed in SNOW_LAYER_DEPTHS
+            ]
+        else:
+            self.snowflakes = [RealisticSnowflake(width, height) for _ in range(num_snowflakes)]
+
+    def step(self, dt):
+        """Move the snow by `dt` seconds."""
+        for layer in self.layers:
+            layer.step(dt)
 
-    def update_and_draw(self, frame):
         for flake in self.snowflakes:
-            flake.update(self.width, self.height)
-            flake.draw(frame)
+            flake.step(dt, self.width, self.height)
+
+    def draw(self, frame, alpha=1.0):
+        """Draw the snow `alpha` of the way from the previous step to the last one."""
+        for layer in self.layers:
+            layer.draw(frame, alpha)
+
+        for flake in self.snowflakes:
+            flake.draw(frame, alpha)
 
 # Initialize globally once
 realistic_snow = None
 
-def draw_snow_effect(frame, x, y, last_time_index_finger_spin):
+def get_realistic_snow(w, h, snow_mode="layers", num_snowflakes=1000):
+    """The shared snowfall, recreated when its size or settings change."""
     global realistic_snow
-
-    def snow_rain():
-        return (current_milli_time() - last_time_index_finger_spin) / 1000 < 1
-
-    h, w = frame.shape[:2]
-    if realistic_snow is None:
-        realistic_snow = RealisticSnowEffect(w, h, num_snowflakes=100)
-
-    if snow_rain():
-        realistic_snow.update_and_draw(frame)
-
-    # Local snow burst around finger
-    for _ in range(30):
+    if (realistic_snow is None or realistic_snow.mode != snow_mode
+            or realistic_snow.num_snowflakes != num_snowflakes
+            or (realistic_snow.width, realistic_snow.height) != (w, h)):
+        realistic_snow = RealisticSnowEffect(w, h, num_snowflakes=num_snowflakes, mode=snow_mode)
+    return realistic_snow
+
+def draw_snow_burst(frame, x, y):
+    """Local snow burst around finger."""
+    for _ in range(scaled_count(30)):
         offset_x = np.random.randint(-40, 40)
         offset_y = np.random.randint(-40, 40)
         scale = np.random.uniform(0.2, 0.6)
         angle = np.random.uniform(0, 360)
 
-        icon = cv2.resize(snowflake_icon, (0, 0), fx=scale, fy=scale)
-        (ih, iw) = icon.shape[:2]
-        center = (iw // 2, ih // 2)
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated = cv2.warpAffine(icon, M, (iw, ih), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0,0,0,0))
-
-        x1 = int(x + offset_x - iw // 2)
-        y1 = int(y + offset_y - ih // 2)
-
-        if 0 <= x1 <= w - iw and 0 <= y1 <= h - ih:
-            icon_rgb = rotated[:, :, :3]
-            icon_alpha = rotated[:, :, 3] / 255.0
-            for c in range(3):
-                frame[y1:y1+ih, x1:x1+iw, c] = (
-                    icon_alpha * icon_rgb[:, :, c] +
-                    (1 - icon_alpha) * frame[y1:y1+ih, x1:x1+iw, c]
-                ).astype(np.uint8)
-
-# Load sparkle images once
-sparkle_images = [
-    cv2.imread(os.path.join("sparkles", f), cv2.IMREAD_UNCHANGED)
-    for f in os.listdir("sparkles")
-    if f.endswith(".png")
-]
+        sprite = sprite_cache.get("snowflake", scale, angle)
+        if sprite is not None:
+            blend_premultiplied_centered(frame, sprite, x + offset_x, y + offset_y)
 
-def overlay_image_alpha(img, img_overlay, x, y, alpha_mask):
-    """Overlay `img_overlay` onto `img` at (x, y) with alpha mask."""
-    h, w = img_overlay.shape[:2]
-    if x < 0 or y < 0 or x + w > img.shape[1] or y + h > img.shape[0]:
-        return  # skip if out of bounds
-
-    roi = img[y:y+h, x:x+w]
-    alpha = alpha_mask.astype(float) / 255
-    for c in range(3):
-        roi[..., c] = roi[..., c] * (1 - alpha) + img_overlay[..., c] * alpha
-
-    img[y:y+h, x:x+w] = roi
-
-def draw_sparkle_effect(frame, x, y, index_finger_history):
-    """Vẽ hiệu ứng sparkle dùng ảnh với nhấp nháy và kích thước ngẫu nhiên."""
+# Sparkle images are counted from the bundle metadata and each is loaded on first draw
+num_sparkle_images = assets.count("sparkles")
+for i in range(num_sparkle_images):
+    sprite_cache.register_lazy(f"sparkle:{i}", lambda i=i: asset_frame("sparkles", i), premultiplied=True)
 
-    def draw_sparkles(px, py, num_sparkles):
-        for _ in range(num_sparkles):
-            if not sparkle_images:
-                continue
-
-            sparkle = random.choice(sparkle_images)
-
-            # Resize random
-            scale = random.uniform(0.2, 0.6)
-            new_w = int(sparkle.shape[1] * scale)
-            new_h = int(sparkle.shape[0] * scale)
-            sparkle_resized = cv2.resize(sparkle, (new_w, new_h), interpolation=cv2.INTER_AREA)
+def overlay_image_alpha(img, img_overlay, x, y, alpha_mask):
+    """Overlay `img_overlay` onto `img` at (x, y) with alpha mask, clipped to the frame."""
+    blend_straight(img, img_overlay[..., :3], alpha_mask, x, y)
 
-            # Random transparency (blink effect)
-            alpha = sparkle_resized[..., 3]
-            blink_factor = random.uniform(0.2, 1.0)
-            alpha = (alpha * blink_factor).astype(np.uint8)
+# Sparkle particles: every frame draws fresh one-frame sparkles at the finger and along its trail
+sparkle_particles = ParticleSystem(capacity=512)
 
-            # Position
-            offset_x = random.randint(-30, 30)
-            offset_y = random.randint(-30, 30)
-            pos_x = int(px + offset_x)
-            pos_y = int(py + offset_y)
+def emit_sparkles(px, py, num_sparkles, now, lifetime):
+    if not num_sparkle_images:
+        return
+    sparkle_particles.emit(
+        px + np.random.randint(-30, 31, num_sparkles),
+        py + np.random.randint(-30, 31, num_sparkles),
+        now,
+        lifetime=lifetime,
+        size=np.random.uniform(0.2, 0.6, num_sparkles),
+        kind=np.random.randint(0, num_sparkle_images, num_sparkles),
+    )
+
+def emit_sparkle_trail(index_finger_history, now):
+    """Two sparkles at every point of the trail (newest first), living one frame; lower quality shortens the trail."""
+    if not index_finger_history:
+        return
+    length = max(1, int(len(index_finger_history) * quality["trail"]))
+    points = np.array(index_finger_history)[:-length - 1:-1]
+    per_point = scaled_count(2)
+    emit_sparkles(np.repeat(points[:, 0], per_point), np.repeat(points[:, 1], per_point),
+                  len(points) * per_point, now, lifetime=1)
+
+def emit_sparkle_burst(x, y, index_finger_history, now):
+    """Sparkles at the finger and along the trail for this frame."""
+    emit_sparkles(x, y, scaled_count(5), now, lifetime=1)
+    emit_sparkle_trail(index_finger_history, now)
+
+def draw_sparkle_particles(frame, now):
+    """Age, cull and draw every live sparkle once per frame."""
+    sparkle_particles.update(now)
+    n = len(sparkle_particles)
+    if n == 0:
+        return
 
-            overlay_image_alpha(frame, sparkle_resized, pos_x, pos_y, alpha)
+    # Random transparency (blink effect)
+    blink = np.random.uniform(0.2, 1.0, n)
 
-    draw_sparkles(x, y, 5)
-    for hx, hy in reversed(index_finger_history):
-        draw_sparkles(hx, hy, 2)
+    for px, py, scale, kind, blink_factor in zip(sparkle_particles.x[:n].tolist(), sparkle_particles.y[:n].tolist(),
+                                                 sparkle_particles.size[:n].tolist(), sparkle_particles.kind[:n].tolist(),
+                                                 blink.tolist()):
+        sparkle = sprite_cache.get(f"sparkle:{kind}", scale)
+        if sparkle is not None:
+            blend_premultiplied(frame, sparkle, int(px), int(py), blink_factor)
 
 def draw_heart_effect(frame, x, y, heart_image):
     """Chèn sticker trái tim nhỏ vào vị trí (x, y)."""
@@ -257,15 +297,9 @@ def draw_heart_effect(frame, x, y, heart_image):
     top_left_x = x - heart_width // 2
     top_left_y = y - heart_height // 2
 
-
-    if top_left_x < 0 or top_left_y < 0 or top_left_x + heart_width > frame.shape[1] or top_left_y + heart_height > frame.shape[0]:
-        return
-
-
-    for i in range(heart_height):
-        for j in range(heart_width):
-            if resized_heart[i, j][3] != 0:  # Kiểm tra alpha channel (kênh trong suốt)
-                frame[top_left_y + i, top_left_x + j] = resized_heart[i, j, :3]
+    # Pixel nào có alpha khác 0 thì vẽ đè hoàn toàn
+    opaque = np.where(resized_heart[..., 3] != 0, 255, 0).astype(np.uint8)
+    blend_straight(frame, resized_heart[..., :3], opaque, top_left_x, top_left_y)
 
 
 def draw_moving_light_effect(frame, x, y):
@@ -354,3 +388,169 @@ def get_rainbow_color(index):
         (0, 0, 255)     # Lam
     ]
     return rainbow_colors[index % len(rainbow_colors)]
+
+
+# ================ EFFECT REGISTRY ==================
+# Mỗi hiệu ứng nhận các bàn tay ở update() và vẽ ở render(); chỉ được tạo khi được chọn lần đầu
+
+class ExplosionEffect(Effect):
+    def __init__(self):
+        # Thời điểm mở tay sau khi nắm, riêng cho từng bàn tay (-inf: chưa từng mở tay)
+        self.hands = HandStates(lambda: {"last_time_hand_open_after_close": -math.inf})
+        self.targets = []
+
+    def update(self, dt, hands):
+        self.targets = []
+        for hand, state in self.hands.update(hands):
+            # Nắm tay rồi mở ra thì nổ mạnh hơn
+            if hand.open_after_close:
+                state["last_time_hand_open_after_close"] = self.clock.now_ms
+            self.targets.append((hand.index_tip, state["last_time_hand_open_after_close"]))
+
+    def step(self, dt):
+        # Phát hạt theo bước mô phỏng cố định, nên mật độ hạt không phụ thuộc FPS
+        for (x, y), last_time_hand_open_after_close in self.targets:
+            emit_explosion(x, y, self.clock.now_ms, last_time_hand_open_after_close)
+
+    def render(self, frame):
+        # Vẽ tất cả các hạt của mọi bàn tay một lần
+        if len(explosion_particles):
+            draw_explosion_particles(frame, self.clock.now_ms)
+        return frame
+
+    def release(self):
+        explosion_particles.clear()
+        sprite_cache.unload("explosion")
+        assets.release("explosion")
+
+class SnowEffect(Effect):
+    def __init__(self, snow_mode="layers", num_snowflakes=1000):
+        self.snow_mode = snow_mode
+        self.num_snowflakes = num_snowflakes
+        # Phát hiện vẽ vòng tròn bằng ngón trỏ (O(1) mỗi điểm mới), riêng cho từng bàn tay
+        # -inf: chưa vẽ vòng tròn nào, kể cả khi đồng hồ bắt đầu từ 0 (thời gian của video)
+        self.hands = HandStates(lambda: {"spin": CircularMotionDetector(maxlen=50),
+                                         "last_time_index_finger_spin": -math.inf})
+        self.last_time_index_finger_spin = -math.inf
+        self.targets = []
+
+    def update(self, dt, hands):
+        for hand, state in self.hands.update(hands):
+            spin = state["spin"]
+            if hand.index_only:
+                index_tip = hand.normalized[8]
+                if spin.add(float(index_tip[0]), float(index_tip[1])):
+                    state["last_time_index_finger_spin"] = self.clock.now_ms
+                    spin.clear()
+            else:
+                spin.clear()
+        # Tuyết rơi khi bất kỳ bàn tay nào vừa vẽ vòng tròn
+        self.last_time_index_finger_spin = max(
+            [self.last_time_index_finger_spin] + [state["last_time_index_finger_spin"] for state in self.hands.values()])
+        self.targets = [hand.index_tip for hand in hands]
+
+    def snowing(self):
+        # Tuyết rơi trong một giây sau lần vẽ vòng tròn gần nhất
+        return (self.clock.now_ms - self.last_time_index_finger_spin) / 1000 < 1
+
+    def step(self, dt):
+        if realistic_snow is not None and self.snowing():
+            realistic_snow.step(dt)
+
+    def render(self, frame):
+        # Tuyết toàn khung hình chỉ vẽ một lần dù có nhiều bàn tay, nội suy giữa hai bước mô phỏng
+        h, w = frame.shape[:2]
+        snow = get_realistic_snow(w, h, self.snow_mode, self.num_snowflakes)
+        if self.targets and self.snowing():
+            snow.draw(frame, self.clock.alpha)
+        for x, y in self.targets:
+            draw_snow_burst(frame, x, y)
+        return frame
+
+    def release(self):
+        global realistic_snow
+        realistic_snow = None
+        sprite_cache.unload("snowflake")
+        assets.release("snowflake")
+
+class SparkleEffect(Effect):
+    def __init__(self):
+        # Lịch sử vị trí ngón trỏ riêng cho từng bàn tay
+        self.hands = HandStates(lambda: deque(maxlen=50))
+        self.targets = []
+
+    def update(self, dt, hands):
+        self.targets = [(hand.index_tip, index_finger_history)
+                        for hand, index_finger_history in self.hands.update(hands)]
+
+    def step(self, dt):
+        # Lấy mẫu vệt theo bước mô phỏng cố định, nên độ dài vệt (theo thời gian) không phụ thuộc FPS
+        for (x, y), index_finger_history in self.targets:
+            index_finger_history.append([x, y])
+
+    def render(self, frame):
+        # Hạt tại ngón tay và dọc vệt chỉ sống một khung hình, rồi vẽ tất cả các hạt một lần
+        now = self.clock.now_ms
+        for (x, y), index_finger_history in self.targets:
+            emit_sparkle_burst(x, y, index_finger_history, now)
+        if len(sparkle_particles):
+            draw_sparkle_particles(frame, now)
+        return frame
+
+    def release(self):
+        sparkle_particles.clear()
+        for i in range(num_sparkle_images):
+            sprite_cache.unload(f"sparkle:{i}")
+        assets.release("sparkles")
+
+class HeartEffect(Effect):
+    def __init__(self):
+        # Ảnh sticker PNG có kênh alpha (trong suốt)
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "heart_sticker.png")
+        self.heart_image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        self.targets = []
+
+    def update(self, dt, hands):
+        self.targets = [hand.index_tip for hand in hands]
+
+    def render(self, frame):
+        if self.heart_image is not None:
+            for x, y in self.targets:
+                draw_heart_effect(frame, x, y, self.heart_image)
+        return frame
+
+class MovingLightEffect(Effect):
+    def __init__(self):
+        self.targets = []
+
+    def update(self, dt, hands):
+        self.targets = [hand.index_tip for hand in hands]
+
+    def render(self, frame):
+        for x, y in self.targets:
+            draw_moving_light_effect(frame, x, y)
+        return frame
+
+class RainbowEffect(Effect):
+    def __init__(self):
+        self.targets = []
+
+    def update(self, dt, hands):
+        # Kích thước bàn tay (cổ tay - đầu ngón giữa) quyết định độ lớn cầu vồng
+        self.targets = [(hand.index_tip, hand.hand_size) for hand in hands]
+
+    def render(self, frame):
+        for (x, y), hand_size in self.targets:
+            draw_rainbow_effect(frame, x, y, hand_size)
+        return frame
+
+def create_effect_registry():
+    """Registry of the effects above, in key order ('1' = explosion ... '6' = rainbow)."""
+    registry = EffectRegistry()
+    registry.register("explosion", ExplosionEffect)
+    registry.register("snow", SnowEffect)
+    registry.register("sparkle", SparkleEffect)
+    registry.register("heart", HeartEffect)
+    registry.register("moving_light", MovingLightEffect)
+    registry.register("rainbow", RainbowEffect)
+    return registry
@@ -1,216 +1,147 @@
 import cv2
 import mediapipe as mp
-from effect import draw_explosion_effect, draw_snow_effect, draw_sparkle_effect, draw_heart_effect, draw_moving_light_effect, draw_rainbow_effect
-import time
-from collections import deque
-import numpy as np
-import math
-
-def current_milli_time():
-    return round(time.time() * 1000)
-
+from effect import create_effect_registry, set_quality
+from Project_IPR.Projects.pipeline.capture import ThreadedCapture
+from Project_IPR.Projects.pipeline.clock import FrameClock
+from Project_IPR.Projects.pipeline.gestures import GestureEngine
+from Project_IPR.Projects.pipeline.governor import QualityGovernor
+from Project_IPR.Projects.pipeline.landmark_filter import PredictiveHands
+from Project_IPR.Projects.pipeline.preprocess import FramePreprocessor
+from Project_IPR.Projects.pipeline.replay import RecordingHands, ReplayHands
+from Project_IPR.Projects.pipeline.roi import HandRoiProcessor
+from Project_IPR.Projects.pipeline.timing import FrameTimer
 # Khởi tạo MediaPipe Hands
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-
-
-# Mở camera
-cap = cv2.VideoCapture(0)
-
-
-# Biến điều khiển hiệu ứng
-effects = ['explosion', 'snow', 'sparkle', 'heart', 'moving_light', 'rainbow']  # Thêm rainbow vào đây
-current_effect_idx = 0  # Chỉ số của hiệu ứng hiện tại
-
-
-# Tải ảnh trái tim (sticker) và ảnh cánh hoa
-heart_image = cv2.imread('heart_sticker.png', cv2.IMREAD_UNCHANGED)  # Đọc ảnh PNG có kênh alpha (trong suốt)
-
-# ================ HAND CLOSE OPEN UTILS ==================
-
-is_hand_closed_before = True
-last_time_hand_open_after_close = 0
-
-def is_hand_open(landmarks):
-    finger_tips = [8, 12, 16, 20]  # các đầu ngón trừ ngón cái
-    finger_pips = [6, 10, 14, 18]  # khớp giữa ngón tay
 
-    open_fingers = 0
-    for tip, pip in zip(finger_tips, finger_pips):
-        if landmarks[tip].y < landmarks[pip].y:
-            open_fingers += 1
+# Độ phân giải camera/hiển thị (None = mặc định của camera) và độ phân giải suy luận
+CAPTURE_WIDTH = None
+CAPTURE_HEIGHT = None
+INFERENCE_SIZE = 640        # cạnh dài nhất của ảnh đưa vào MediaPipe
+INFERENCE_ROI = False       # chỉ suy luận vùng quanh bàn tay ở khung trước
+INFERENCE_EVERY_N = 1       # suy luận mỗi N khung, các khung còn lại dự đoán landmark
+INFERENCE_SHARE = None      # hoặc: chỉ suy luận khi tốn ít hơn tỉ lệ thời gian này (vd 0.5)
+MAX_NUM_HANDS = 2           # số bàn tay tối đa được theo dõi, mỗi tay có hiệu ứng riêng
 
-    return open_fingers >= 3  # ít nhất 3 ngón mở => coi như mở tay
+hand_roi = HandRoiProcessor(
+    mp_hands.Hands(max_num_hands=MAX_NUM_HANDS, min_detection_confidence=0.5, min_tracking_confidence=0.5),
+    max_size=INFERENCE_SIZE, roi=INFERENCE_ROI,
+    # Vùng cắt đổi vị trí theo tay nên được suy luận riêng, từng ảnh độc lập
+    roi_hands=mp_hands.Hands(static_image_mode=True, max_num_hands=MAX_NUM_HANDS,
+                             min_detection_confidence=0.5) if INFERENCE_ROI else None)
+hands = PredictiveHands(hand_roi, every_n=INFERENCE_EVERY_N, inference_share=INFERENCE_SHARE)
 
-# ================ INDEX FINGER DETECT UTILS ==================
+# Ghi lại landmark của phiên (file .npz hoặc thư mục) hoặc phát lại landmark đã ghi thay cho MediaPipe
+RECORD_LANDMARKS = None     # vd "session.npz"
+REPLAY_LANDMARKS = None     # vd "session.npz"
+REPLAY_REALTIME = True      # False: phát lại nhanh nhất có thể
 
-index_finger_history = deque(maxlen=50)
-last_time_index_finger_spin = 0
+if REPLAY_LANDMARKS:
+    hands = ReplayHands(REPLAY_LANDMARKS, realtime=REPLAY_REALTIME, loop=True)
+elif RECORD_LANDMARKS:
+    hands = RecordingHands(hands, RECORD_LANDMARKS, max_hands=MAX_NUM_HANDS)
 
-def is_only_index_raised(hand_landmarks):
-    fingers = []
 
-    if hand_landmarks.landmark[4].x < hand_landmarks.landmark[3].x:
-        fingers.append(1)  # Thumb
-    else:
-        fingers.append(0)
+# Mở camera (đọc khung hình trên luồng riêng)
+cap = ThreadedCapture(0, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT).start()
+preprocessor = FramePreprocessor(flip=True)
 
-    fingers.append(int(hand_landmarks.landmark[8].y < hand_landmarks.landmark[6].y))   # Index
-    fingers.append(int(hand_landmarks.landmark[12].y < hand_landmarks.landmark[10].y)) # Middle
-    fingers.append(int(hand_landmarks.landmark[16].y < hand_landmarks.landmark[14].y)) # Ring
-    fingers.append(int(hand_landmarks.landmark[20].y < hand_landmarks.landmark[18].y)) # Pinky
 
-    return fingers == [0, 1, 0, 0, 0]
+# Biến điều khiển hiệu ứng: chỉ tạo hiệu ứng khi được chọn, hiệu ứng cũ được giải phóng
+effect_registry = create_effect_registry()
+effect_registry.select('explosion')
 
-def calculate_angle(p1, p2, center):
-    """Tính góc (radian) từ center đến p1 và p2"""
-    v1 = p1 - center
-    v2 = p2 - center
-    angle = math.atan2(v2[1], v2[0]) - math.atan2(v1[1], v1[0])
-    angle = (angle + math.pi * 2) % (math.pi * 2)  # Normalize to [0, 2π]
-    return angle
+# Phím số để chọn hiệu ứng ('4' - trái tim - đang tắt)
+EFFECT_KEYS = {'1': 'explosion', '2': 'snow', '3': 'sparkle', '5': 'moving_light', '6': 'rainbow'}
 
-def detect_circular_motion(history):
-    if len(history) < 20:
-        return False
+# ================ GESTURE UTILS ==================
 
-    points = np.array(history)
-    center = np.mean(points, axis=0)
+# Mở/nắm tay, chỉ giơ ngón trỏ, kích thước bàn tay... tính một lần cho mọi bàn tay
+gesture_engine = GestureEngine()
 
-    total_angle = 0
-    direction_consistency = 0
-    last_angle = None
+# Một mốc thời gian chung cho mỗi khung hình; hiệu ứng mô phỏng theo bước cố định nên không chậm lại khi mất khung
+frame_clock = FrameClock()
 
-    for i in range(1, len(points)):
-        angle = calculate_angle(points[i-1], points[i], center)
+# ================ ĐO THỜI GIAN TỪNG BƯỚC ==================
+# Phím 'h' bật/tắt bảng thời gian trên màn hình, 't' bật/tắt ghi ra CSV
+frame_timer = FrameTimer()
+show_hud = False
+TIMINGS_CSV = "frame_timings.csv"
 
-        if last_angle is not None:
-            delta = angle
-            if delta > math.pi:
-                delta -= 2 * math.pi
-            direction_consistency += delta
-            total_angle += abs(delta)
-        last_angle = angle
+# ================ TỰ ĐỘNG GIẢM CHẤT LƯỢNG KHI KHÔNG ĐỦ FPS ==================
 
-    # Convert total angular movement to degrees
-    total_angle_degrees = total_angle * 180 / math.pi
-    consistency_degrees = abs(direction_consistency) * 180 / math.pi
+TARGET_FPS = 30
+quality_governor = QualityGovernor(target_fps=TARGET_FPS)
 
-    # Criteria: moved at least ~270° and not reversing direction frequently
-    return total_angle_degrees > 270 and consistency_degrees > 200
 
-# ================ INDEX FINGER STORE UTILS FOR SPARKLES EFFECT ==================
+def apply_quality(settings):
+    # Số hạt, độ dài vệt, độ phân giải sprite và độ phân giải suy luận
+    set_quality(settings)
+    hand_roi.max_size = int(INFERENCE_SIZE * settings["inference"])
 
-index_finger_history_for_sparkles = deque(maxlen=50)
 
-
-def calculate_hand_size(hand_landmarks, image_width, image_height):
-    """Tính kích thước tương đối của bàn tay dựa trên khoảng cách giữa các điểm đặc trưng."""
-
-    # Chọn hai điểm cố định để đo (ví dụ: cổ tay và đầu ngón giữa)
-    wrist = hand_landmarks.landmark[0]
-    middle_finger_tip = hand_landmarks.landmark[12]
-
-    # Tính khoảng cách Euclidean
-    x1, y1 = wrist.x * image_width, wrist.y * image_height
-    x2, y2 = middle_finger_tip.x * image_width, middle_finger_tip.y * image_height
-
-    distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-    return distance  # Khoảng cách pixel
+quality_governor.on_change(apply_quality)
 
 while cap.isOpened():
-    ret, frame = cap.read()
+    frame_timer.begin_frame()
+    # Chờ đến khi có khung hình mới như cv2.VideoCapture; chỉ thoát khi camera ngừng hẳn
+    with frame_timer.stage("capture"):
+        ret, frame = cap.read(timeout=None)
     if not ret:
         break
 
 
-    # Lật ảnh để không bị ngược
-    frame = cv2.flip(frame, 1)
-
-
-    # Chuyển đổi màu từ BGR sang RGB
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    # Lật ảnh để không bị ngược và chuyển sang RGB, ghi vào bộ đệm dùng lại
+    with frame_timer.stage("preprocess"):
+        frame, rgb_frame = preprocessor.process(frame)
 
 
     # Dự đoán bàn tay
-    results = hands.process(rgb_frame)
+    with frame_timer.stage("inference"):
+        results = hands.process(rgb_frame)
 
+    h, w, c = frame.shape
+    detected = []
     if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            # Lấy tọa độ ngón tay trỏ
-            index_finger = hand_landmarks.landmark[8]
-            h, w, c = frame.shape
-            x = int(index_finger.x * w)
-            y = int(index_finger.y * h)
-
-            # ===================== DETECT IS HAND CLOSE AND OPEN =======================
-
-            is_hand_open_after_close = False
-
-            if is_hand_open(hand_landmarks.landmark):
-                is_hand_open_after_close = is_hand_closed_before
-                is_hand_closed_before = False
-            else:
-                is_hand_closed_before = True
-
-            if is_hand_open_after_close:
-                last_time_hand_open_after_close = current_milli_time()
-
-            # ==================== DETECT INDEX FINGER SPIN ===============================
-            if is_only_index_raised(hand_landmarks):
-                index_tip = hand_landmarks.landmark[8]
-                index_finger_history.append(np.array([index_tip.x, index_tip.y]))
-
-                if detect_circular_motion(index_finger_history):
-                    last_time_index_finger_spin = current_milli_time()
-                    index_finger_history.clear()
-            else:
-                index_finger_history.clear()
-            # ==================== STORE INDEX FINGER HISTORY FOR SPARKLES EFFECT ===============================
-
-            index_finger_history_for_sparkles.append([x, y])
-
-
-            # ==================== CALCULATE DEPTH ===============================
-            # Lấy tọa độ z của cổ tay (landmark số 0)
-            hand_size = calculate_hand_size(hand_landmarks, frame.shape[1], frame.shape[0])
-
-            # Áp dụng hiệu ứng dựa trên biến current_effect_idx
-            if effects[current_effect_idx] == 'explosion':
-                draw_explosion_effect(frame, x, y, last_time_hand_open_after_close)
-            elif effects[current_effect_idx] == 'snow':
-                draw_snow_effect(frame, x, y, last_time_index_finger_spin)
-            elif effects[current_effect_idx] == 'sparkle':
-                draw_sparkle_effect(frame, x, y, index_finger_history_for_sparkles)
-            elif effects[current_effect_idx] == 'heart':
-                draw_heart_effect(frame, x, y, heart_image)  # Truyền heart_image vào đây
-            elif effects[current_effect_idx] == 'moving_light':
-                draw_moving_light_effect(frame, x, y)
-            elif effects[current_effect_idx] == 'rainbow':  # Hiệu ứng cầu vồng
-                draw_rainbow_effect(frame, x, y, hand_size)
-
+        with frame_timer.stage("gestures"):
+            detected = gesture_engine.update(results, w, h)
 
-    # Hiển thị hình ảnh
-    cv2.imshow("Hand Tracking with Effects", frame)
+    # Áp dụng hiệu ứng đang chọn cho mọi bàn tay
+    frame_clock.tick()
+    with frame_timer.stage("effect:" + effect_registry.active_name):
+        active_effect = effect_registry.active
+        active_effect.advance(frame_clock, detected)
+        frame = active_effect.render(frame)
 
 
-    # Nhấn phím để chuyển đổi hiệu ứng
-    key = cv2.waitKey(1) & 0xFF
+    if show_hud:
+        frame_timer.draw_hud(frame)
+    if quality_governor.degraded:
+        quality_text = "Quality: " + quality_governor.level_name
+        cv2.putText(frame, quality_text, (frame.shape[1] - 160, 20), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 0, 0), 3, cv2.LINE_AA)
+        cv2.putText(frame, quality_text, (frame.shape[1] - 160, 20), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 200, 255), 1, cv2.LINE_AA)
 
-
-    if key == ord('1'):  # Phím '1' để chọn hiệu ứng nổ
-        current_effect_idx = 0
-    elif key == ord('2'):  # Phím '2' để chọn hiệu ứng tuyết
-        current_effect_idx = 1
-    elif key == ord('3'):  # Phím '3' để chọn hiệu ứng nhấp nháy ánh sáng
-        current_effect_idx = 2
-    # elif key == ord('4'):  # Phím '4' để chọn hiệu ứng trái tim
-    #     current_effect_idx = 3
-    elif key == ord('5'):  # Phím '5' để chọn hiệu ứng ánh sáng chuyển động
-        current_effect_idx = 4
-    elif key == ord('6'):  # Phím '6' để chọn hiệu ứng cầu vồng
-        current_effect_idx = 5
+    # Hiển thị hình ảnh
+    with frame_timer.stage("display"):
+        cv2.imshow("Hand Tracking with Effects", frame)
+
+
+        # Nhấn phím để chuyển đổi hiệu ứng
+        key = cv2.waitKey(1) & 0xFF
+    frame_timer.end_frame()
+    # Chỉ tính thời gian xử lý: cap.read() chờ khung hình mới và waitKey() không phải chi phí của hiệu ứng
+    quality_governor.update(frame_timer.processing_time())
+
+
+    if chr(key) in EFFECT_KEYS:  # Phím số để chọn hiệu ứng
+        effect_registry.select(EFFECT_KEYS[chr(key)])
+    elif key == ord('h'):  # Phím 'h' để bật/tắt bảng thời gian
+        show_hud = not show_hud
+    elif key == ord('t'):  # Phím 't' để bật/tắt ghi thời gian ra CSV
+        if frame_timer.recording_csv:
+            frame_timer.stop_csv()
+        else:
+            frame_timer.start_csv(TIMINGS_CSV)
     elif key == ord('q'):  # Nhấn 'q' để thoát
         break
 
@@ -218,3 +149,6 @@ while cap.isOpened():
 # Giải phóng tài nguyên khi thoát
 cap.release()
 cv2.destroyAllWindows()
+frame_timer.stop_csv()
+if isinstance(hands, RecordingHands):
+    hands.save()
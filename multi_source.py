@@ -0,0 +1,261 @@
+"""
+Run the gesture-effect pipeline on several sources at once: every source
+(video file, capture device or synthetic frames) gets its own worker process
+with its own hand tracker and effect state, optionally pinned to its own
+CPUs. Reports per-source and aggregate throughput as JSON.
+
+    python multi_source.py clip1.mp4 clip2.mp4 clip3.mp4 --effect snow --pin
+    python multi_source.py 0 1 --inference mediapipe --effect Fire --display
+    python multi_source.py synthetic synthetic --frames 600 --workers 1   # scaling baseline
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from benchmark import STAGES, FrameSource, effect_names, make_effect, summarize, synthetic_landmarks
+from Project_IPR.Projects.pipeline.clock import FrameClock
+from Project_IPR.Projects.pipeline.gestures import GestureEngine
+from Project_IPR.Projects.pipeline.preprocess import FramePreprocessor
+from Project_IPR.Projects.pipeline.replay import ReplayHands, load_recording
+
+
+def cpu_sets(num_workers, cpus_per_worker=1, cpus=None):
+    """
+    Split CPUs into one set per worker, wrapping around when there are more
+    workers than CPUs.
+
+    Args:
+        cpus (list, optional): CPUs to use (default: every CPU this process may run on)
+    """
+    if cpus is None:
+        cpus = sorted(os.sched_getaffinity(0))
+    sets = []
+    for worker in range(num_workers):
+        start = worker * cpus_per_worker
+        sets.append({cpus[(start + k) % len(cpus)] for k in range(cpus_per_worker)})
+    return sets
+
+
+def cpu_queue_for(context, num_workers, cpus_per_worker=1, cpus=None):
+    """
+    Queue of CPU sets that `init_worker` pins each worker to, or None (with a
+    warning) where the platform can't pin processes.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        warnings.warn("CPU pinning is not supported on this platform; running unpinned", RuntimeWarning)
+        return None
+    cpu_queue = context.Queue()
+    for cpu_set in cpu_sets(num_workers, cpus_per_worker, cpus):
+        cpu_queue.put(cpu_set)
+    return cpu_queue
+
+
+def init_worker(cpu_queue, threads):
+    # Keep OpenCV from starting a thread per core in every worker
+    cv2.setNumThreads(threads)
+    if cpu_queue is not None:
+        os.sched_setaffinity(0, cpu_queue.get())
+
+
+def open_capture(source):
+    """Open a device index ("0"), a video file, or None for "synthetic" frames"""
+    if source == "synthetic":
+        return None
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open source: {source}")
+    return cap
+
+
+def make_hands(options):
+    if options["inference"] == "mediapipe":
+        import mediapipe as mp
+        return mp.solutions.hands.Hands(max_num_hands=options["hands"],
+                                        min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    if options["landmarks"]:
+        return ReplayHands(load_recording(options["landmarks"]), loop=True)
+    return ReplayHands.from_arrays(synthetic_landmarks(300, options["hands"]), loop=True)
+
+
+def run_source(source, options):
+    """
+    Run the pipeline on one source until it ends or `options["frames"]`
+    frames were processed (devices and synthetic frames never end, so they
+    stop after 300 by default). Runs inside a worker process, so the effect
+    state, asset caches and hand tracker all belong to this source alone.
+    """
+    cap = open_capture(source)
+    synthetic = FrameSource(None, options["width"], options["height"]) if cap is None else None
+    is_device = source.isdigit()
+    max_frames = options["frames"]
+    if max_frames is None and (cap is None or is_device):
+        max_frames = 300
+    fps = cap.get(cv2.CAP_PROP_FPS) if cap is not None and not is_device else 0
+    hands = make_hands(options)
+    engine = GestureEngine()
+    registry, active_effect = make_effect(options["effect"])
+    preprocessor = FramePreprocessor(flip=is_device)
+    # Video files advance the effects by their own timestamps, however fast they are processed
+    clock = FrameClock()
+    window = f"{options['effect']} - {source}"
+
+    frame_times = []
+    stage_times = {stage: [] for stage in STAGES}
+    started = time.time()
+    start = time.perf_counter()
+    while max_frames is None or len(frame_times) < max_frames:
+        t0 = time.perf_counter()
+        if cap is None:
+            ret, frame = True, synthetic.read()
+        else:
+            ret, frame = cap.read()
+        if not ret:
+            break
+        t1 = time.perf_counter()
+        frame, rgb_frame = preprocessor.process(frame)
+        t2 = time.perf_counter()
+        results = hands.process(rgb_frame)
+        t3 = time.perf_counter()
+        h, w = frame.shape[:2]
+        detected = engine.update(results, w, h) if results.multi_hand_landmarks else []
+        t4 = time.perf_counter()
+        clock.tick(len(frame_times) / fps if fps else None)
+        active_effect.advance(clock, detected)
+        frame = active_effect.render(frame)
+        t5 = time.perf_counter()
+
+        frame_times.append(t5 - t0)
+        for stage, dt in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+            stage_times[stage].append(dt)
+
+        if options["display"]:
+            cv2.imshow(window, frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    seconds = time.perf_counter() - start
+
+    if cap is not None:
+        cap.release()
+    if options["display"]:
+        cv2.destroyWindow(window)
+    if hasattr(hands, "close"):
+        hands.close()
+    registry.release_all()
+
+    return {
+        "pid": os.getpid(),
+        "cpus": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+        "frames": len(frame_times),
+        "seconds": round(seconds, 3),
+        "fps": round(len(frame_times) / seconds, 2) if seconds else 0.0,
+        **summarize(frame_times),
+        "stages": {stage: summarize(times) for stage, times in stage_times.items()},
+        "frame_times": frame_times,
+        "window": (started, started + seconds),
+    }
+
+
+def run_sources(sources, options, workers=None, pin=False, cpus_per_worker=1, cpus=None, threads=1):
+    """
+    Run every source in a pool of worker processes and aggregate their reports.
+
+    Args:
+        workers (int, optional): Pool size (default: one per source, at most one per CPU)
+        pin (bool): Pin each worker to its own CPU set (Linux only)
+        cpus_per_worker (int): Size of each worker's CPU set when pinning
+        cpus (list, optional): CPUs to pin workers to (default: all available)
+        threads (int): OpenCV threads per worker
+
+    Returns:
+        dict: Report with "sources" and "aggregate" sections
+    """
+    workers = workers or min(len(sources), os.cpu_count() or 1)
+    # Spawn fresh interpreters: nothing (module globals, tracker threads) is inherited from this process
+    context = multiprocessing.get_context("spawn")
+    cpu_queue = cpu_queue_for(context, workers, cpus_per_worker, cpus) if pin else None
+
+    start = time.perf_counter()
+    reports = {}
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                             initargs=(cpu_queue, threads)) as pool:
+        futures = {pool.submit(run_source, source, options): (i, source) for i, source in enumerate(sources)}
+        for future in as_completed(futures):
+            i, source = futures[future]
+            reports[f"{i}:{source}"] = future.result()
+    wall = time.perf_counter() - start
+
+    frame_times = np.concatenate([report.pop("frame_times") for report in reports.values()])
+    frames = sum(report["frames"] for report in reports.values())
+    # Throughput over the time any worker was processing frames, excluding process startup
+    windows = [report.pop("window") for report in reports.values()]
+    busy = max(end for _, end in windows) - min(start for start, _ in windows)
+    return {
+        "sources": dict(sorted(reports.items(), key=lambda item: int(item[0].split(":")[0]))),
+        "aggregate": {
+            "workers": workers,
+            "frames": frames,
+            "wall_seconds": round(wall, 3),
+            "busy_seconds": round(busy, 3),
+            "fps": round(frames / busy, 2) if busy else 0.0,
+            "sum_source_fps": round(sum(report["fps"] for report in reports.values()), 2),
+            **summarize(frame_times),
+        },
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the gesture-effect pipeline on several sources in parallel")
+    parser.add_argument("sources", nargs="+",
+                        help='Video files, capture device indices (e.g. "0") or "synthetic"')
+    parser.add_argument("--effect", default="snow", choices=effect_names(), help="Effect on every source")
+    parser.add_argument("--frames", type=int, help="Stop each source after this many frames "
+                                                   "(default: end of video, 300 for devices and synthetic)")
+    parser.add_argument("--width", type=int, default=640, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=480, help="Synthetic frame height")
+    parser.add_argument("--inference", choices=["replay", "mediapipe"], default="replay",
+                        help="Replay landmarks or run a MediaPipe Hands instance per source")
+    parser.add_argument("--landmarks", help="Landmark recording to replay instead of synthetic landmarks")
+    parser.add_argument("--hands", type=int, default=2, help="Maximum number of hands per source")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per source, at most one per CPU)")
+    parser.add_argument("--pin", action="store_true", help="Pin each worker to its own CPUs (Linux)")
+    parser.add_argument("--cpus-per-worker", type=int, default=1, help="CPUs per worker when pinning")
+    parser.add_argument("--cpus", type=int, nargs="+", help="CPUs to pin workers to (default: all available)")
+    parser.add_argument("--threads", type=int, default=1, help="OpenCV threads per worker")
+    parser.add_argument("--display", action="store_true", help="Show each source in its own window")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {
+        "effect": args.effect,
+        "frames": args.frames,
+        "width": args.width,
+        "height": args.height,
+        "inference": args.inference,
+        "landmarks": args.landmarks,
+        "hands": args.hands,
+        "display": args.display,
+    }
+    report = run_sources(args.sources, options, workers=args.workers, pin=args.pin,
+                         cpus_per_worker=args.cpus_per_worker, cpus=args.cpus, threads=args.threads)
+    report = {"config": {**options, "sources": args.sources, "pin": args.pin}, **report}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
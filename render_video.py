@@ -0,0 +1,283 @@
+"""
+Offline batch rendering: runs hand detection and an effect over a video file
+without opening a window and writes the result with cv2.VideoWriter. The video
+is split into chunks rendered in parallel by a process pool; each chunk first
+replays a short overlap before its start (not written) so particles, trails
+and hand tracking are already warm, then the chunks are stitched in order.
+
+    python render_video.py clip.mp4 clip_snow.mp4 --effect snow
+    python render_video.py clip.mp4 clip_fire.mp4 --effect Fire --inference mediapipe --workers 8
+    python render_video.py clip.mp4 out.mp4 --landmarks clip.npz --chunk-seconds 5 --report render.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from benchmark import effect_names, make_effect
+from multi_source import cpu_queue_for, init_worker, make_hands
+from Project_IPR.Projects.pipeline.clock import FrameClock
+from Project_IPR.Projects.pipeline.gestures import GestureEngine
+from Project_IPR.Projects.pipeline.preprocess import FramePreprocessor
+from Project_IPR.Projects.pipeline.replay import ReplayHands
+
+
+def probe(path):
+    """Get (frame count, fps, width, height) of a video; the count is 0 when unknown"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {path}")
+    info = (int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0,
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    return info
+
+
+def plan_chunks(num_frames, chunk_frames, overlap_frames):
+    """
+    Split frames [0, num_frames) into chunks.
+
+    Returns:
+        list: (warm-up start, start, end) frame indices per chunk. The last
+        chunk's end is None, so it runs to the real end of the video even
+        when the container's frame count is off.
+    """
+    if num_frames <= 0:
+        return [(0, 0, None)]
+    chunks = []
+    for start in range(0, num_frames, chunk_frames):
+        end = start + chunk_frames if start + chunk_frames < num_frames else None
+        chunks.append((max(0, start - overlap_frames), start, end))
+    return chunks
+
+
+def seek(cap, index):
+    """Position `cap` on frame `index`, decoding forward when the backend can't seek"""
+    if index == 0:
+        return
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, index) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == index:
+        return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(index):
+        if not cap.grab():
+            break
+
+
+def render_chunk(chunk_index, chunk, input_path, part_path, options):
+    """
+    Render one chunk into its own part file. Runs inside a worker process.
+    Frames from the warm-up start up to the chunk start go through the whole
+    pipeline but are not written.
+    """
+    warm_start, start, end = chunk
+    # Same chunk, same random effects on every run
+    random.seed(options["seed"] + chunk_index)
+    np.random.seed(options["seed"] + chunk_index)
+
+    cap = cv2.VideoCapture(input_path)
+    seek(cap, warm_start)
+    fps = options["fps"]
+    hands = make_hands(options)
+    if isinstance(hands, ReplayHands):
+        hands.index = warm_start
+    engine = GestureEngine()
+    registry, active_effect = make_effect(options["effect"])
+    preprocessor = FramePreprocessor(flip=False)
+    clock = FrameClock()
+    writer = cv2.VideoWriter(part_path, cv2.VideoWriter_fourcc(*options["fourcc"]), fps,
+                             (options["width"], options["height"]))
+
+    index = warm_start
+    written = 0
+    started = time.perf_counter()
+    while end is None or index < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame, rgb_frame = preprocessor.process(frame)
+        results = hands.process(rgb_frame)
+        h, w = frame.shape[:2]
+        detected = engine.update(results, w, h) if results.multi_hand_landmarks else []
+        # Effects run on video time, so chunks line up wherever they start
+        clock.tick(index / fps)
+        active_effect.advance(clock, detected)
+        frame = active_effect.render(frame)
+        if index >= start:
+            writer.write(frame)
+            written += 1
+        index += 1
+    seconds = time.perf_counter() - started
+
+    writer.release()
+    cap.release()
+    if hasattr(hands, "close"):
+        hands.close()
+    registry.release_all()
+    return {
+        "start": start,
+        "frames": written,
+        "warmup_frames": start - warm_start,
+        "seconds": round(seconds, 3),
+        "fps": round(written / seconds, 2) if seconds else 0.0,
+    }
+
+
+def stitch(part_paths, output_path, fourcc, fps, size):
+    """
+    Join the part files in order. Uses ffmpeg's concat demuxer without
+    re-encoding when ffmpeg is installed, otherwise decodes the parts and
+    writes them again with cv2.VideoWriter.
+
+    Returns:
+        str: "ffmpeg" or "opencv", whichever did the stitching
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is not None:
+        list_path = os.path.join(os.path.dirname(part_paths[0]), "parts.txt")
+        with open(list_path, "w") as f:
+            for path in part_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+        done = subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                               "-i", list_path, "-c", "copy", output_path])
+        if done.returncode == 0:
+            return "ffmpeg"
+
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    for path in part_paths:
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            writer.write(frame)
+        cap.release()
+    writer.release()
+    return "opencv"
+
+
+def render_video(input_path, output_path, options, workers=None, chunk_seconds=10.0, overlap_seconds=1.5,
+                 pin=False, threads=1, keep_parts=False, progress=print):
+    """
+    Render `input_path` with an effect into `output_path`, in parallel chunks.
+
+    Args:
+        options (dict): "effect", "inference", "landmarks", "hands", "fourcc"
+            and "seed" (see `parse_args`)
+        workers (int, optional): Worker processes (default: one per CPU)
+        chunk_seconds (float): Length of each chunk in video time
+        overlap_seconds (float): Video time replayed before each chunk to
+            warm up stateful effects and hand tracking
+        pin (bool): Pin each worker to its own CPU (Linux only)
+        threads (int): OpenCV threads per worker
+        keep_parts (bool): Keep the rendered part files next to the output
+        progress: Called with a message as chunks finish, or None
+
+    Returns:
+        dict: Render report
+    """
+    num_frames, fps, width, height = probe(input_path)
+    options = {**options, "fps": fps, "width": width, "height": height}
+    chunks = plan_chunks(num_frames, max(1, int(round(chunk_seconds * fps))), int(round(overlap_seconds * fps)))
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    part_dir = tempfile.mkdtemp(prefix="render_parts_", dir=os.path.dirname(os.path.abspath(output_path)))
+    extension = os.path.splitext(output_path)[1] or ".mp4"
+    part_paths = [os.path.join(part_dir, f"part{i:04d}{extension}") for i in range(len(chunks))]
+
+    context = multiprocessing.get_context("spawn")
+    cpu_queue = cpu_queue_for(context, workers) if pin else None
+
+    start = time.perf_counter()
+    reports = [None] * len(chunks)
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                 initargs=(cpu_queue, threads)) as pool:
+            futures = {pool.submit(render_chunk, i, chunk, input_path, part_paths[i], options): i
+                       for i, chunk in enumerate(chunks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                reports[i] = future.result()
+                if progress is not None:
+                    progress(f"[{done}/{len(chunks)}] chunk {i + 1}: {reports[i]['frames']} frames at {reports[i]['fps']} fps")
+        render_seconds = time.perf_counter() - start
+
+        stitcher = stitch(part_paths, output_path, options["fourcc"], fps, (width, height))
+    finally:
+        if not keep_parts:
+            shutil.rmtree(part_dir, ignore_errors=True)
+    seconds = time.perf_counter() - start
+
+    frames = sum(report["frames"] for report in reports)
+    return {
+        "input": input_path,
+        "output": output_path,
+        "effect": options["effect"],
+        "frames": frames,
+        "video_seconds": round(frames / fps, 3),
+        "workers": workers,
+        "chunks": reports,
+        "warmup_frames": sum(report["warmup_frames"] for report in reports),
+        "render_seconds": round(render_seconds, 3),
+        "stitch": stitcher,
+        "seconds": round(seconds, 3),
+        "fps": round(frames / seconds, 2) if seconds else 0.0,
+        "realtime_factor": round(frames / fps / seconds, 2) if seconds else 0.0,
+        "parts": part_dir if keep_parts else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render a gesture effect onto a video file offline, in parallel chunks")
+    parser.add_argument("input", help="Input video file")
+    parser.add_argument("output", help="Output video file")
+    parser.add_argument("--effect", default="snow", choices=effect_names(), help="Effect to render")
+    parser.add_argument("--inference", choices=["replay", "mediapipe"], default="mediapipe",
+                        help="Run MediaPipe on the frames or replay landmarks")
+    parser.add_argument("--landmarks", help="Landmark recording of the video to replay (with --inference replay; "
+                                            "synthetic landmarks otherwise)")
+    parser.add_argument("--hands", type=int, default=2, help="Maximum number of hands")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-seconds", type=float, default=10.0, help="Video time per chunk")
+    parser.add_argument("--overlap-seconds", type=float, default=1.5,
+                        help="Video time replayed before each chunk to warm up effects and tracking")
+    parser.add_argument("--fourcc", default="mp4v", help="Output codec")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the effects")
+    parser.add_argument("--pin", action="store_true", help="Pin each worker to its own CPU (Linux)")
+    parser.add_argument("--threads", type=int, default=1, help="OpenCV threads per worker")
+    parser.add_argument("--keep-parts", action="store_true", help="Keep the per-chunk part files")
+    parser.add_argument("--report", help="Write a JSON render report here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {
+        "effect": args.effect,
+        "inference": args.inference,
+        "landmarks": args.landmarks,
+        "hands": args.hands,
+        "fourcc": args.fourcc,
+        "seed": args.seed,
+    }
+    report = render_video(args.input, args.output, options, workers=args.workers,
+                          chunk_seconds=args.chunk_seconds, overlap_seconds=args.overlap_seconds,
+                          pin=args.pin, threads=args.threads, keep_parts=args.keep_parts)
+    print(f"Wrote {report['output']}: {report['frames']} frames in {report['seconds']} s "
+          f"({report['fps']} fps, {report['realtime_factor']}x real time)")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()